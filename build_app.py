@@ -1,36 +1,59 @@
 # build_app.py
 # Script to build ZENIA PDF Processor application with proper icon support
 
+import argparse
 import os
 import sys
 import subprocess
 import shutil
 from pathlib import Path
 
-def build_app():
+from dependencies import missing, pillow_simd_installed
+
+def build_app(clean=False, verbose=False, pillow_simd=False):
     print("Starting ZENIA PDF Processor build process...")
     
     # Ensure all required packages are installed
     print("Installing required packages...")
     packages = [
-        "pyinstaller",
+        "pyinstaller>=6.4",  # Analysis(optimize=...) support
         "customtkinter",
         "pillow",
         "PyMuPDF",
         "openpyxl"
     ]
     
-    for package in packages:
-        subprocess.run([sys.executable, "-m", "pip", "install", "--upgrade", package])
+    todo = missing(packages)
+    
+    if todo:
+        # A single pip invocation resolves everything at once
+        try:
+            subprocess.run([
+                sys.executable, "-m", "pip", "install", "--upgrade",
+                "--disable-pip-version-check", "--no-input",
+                *todo
+            ], check=True, stdout=None if verbose else subprocess.DEVNULL)
+        except (subprocess.SubprocessError, OSError) as e:
+            # Stop before PyInstaller runs against a broken environment
+            print(f"Error: Failed to install required packages: {e}")
+            print(f"Install them manually: pip install {' '.join(todo)}")
+            return False
+        print("Packages installed successfully.")
+    else:
+        print("All required packages already installed.")
     
-    print("Packages installed successfully.")
+    # Pillow-SIMD only ships as source, so it is never installed unless asked for
+    if pillow_simd and not pillow_simd_installed():
+        install_pillow_simd(verbose)
     
     # Create a spec file with proper configuration
     spec_content = """# -*- mode: python ; coding: utf-8 -*-
-from PyInstaller.utils.hooks import collect_submodules, collect_data_files
+from PyInstaller.utils.hooks import collect_data_files
 
+# customtkinter's own imports are followed by Analysis; only its theme
+# JSON/font data needs collecting, which avoids walking every submodule
 hiddenimports = []
-hiddenimports += collect_submodules('customtkinter')
+hiddenimports += ['customtkinter']
 hiddenimports += ['fitz', 'PyMuPDF']  # Explicitly include PyMuPDF modules
 hiddenimports += ['openpyxl']
 
@@ -42,13 +65,14 @@ a = Analysis(
         ('logo.png', '.'), 
         ('app_icon.png', '.'), 
         ('hazmat.png', '.')
-    ],
+    ] + collect_data_files('customtkinter'),
     hiddenimports=hiddenimports,
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
     excludes=[],
     noarchive=False,
+    optimize=2,
 )
 
 pyz = PYZ(a.pure)
@@ -56,6 +80,7 @@ pyz = PYZ(a.pure)
 exe = EXE(
     pyz,
     a.scripts,
+    [('O', None, 'OPTION'), ('O', None, 'OPTION')],  # Run with python -OO
     a.binaries,
     a.datas,
     [],
@@ -64,7 +89,14 @@ exe = EXE(
     bootloader_ignore_signals=False,
     strip=False,
     upx=True,
-    upx_exclude=[],
+    # Decompressing these on every launch costs more than the space saved
+    upx_exclude=[
+        'python3*.dll',
+        'vcruntime*.dll',
+        'api-ms-*.dll',
+        '_ssl*.pyd',
+        '_hashlib*.pyd',
+    ],
     runtime_tmpdir=None,
     console=False,
     disable_windowed_traceback=False,
@@ -96,7 +128,16 @@ if sys.platform == 'darwin':
     
     # Run PyInstaller
     print("Building application with PyInstaller...")
-    subprocess.run(["pyinstaller", "--clean", "ZENIA_PDF_Processor.spec"])
+    # Reuse the build/ cache between runs unless a clean build is requested;
+    # --noconfirm keeps PyInstaller from prompting before replacing dist/
+    pyinstaller_args = ["pyinstaller", "--noconfirm", "ZENIA_PDF_Processor.spec"]
+    if clean:
+        pyinstaller_args.insert(1, "--clean")
+    try:
+        subprocess.run(pyinstaller_args, check=True)
+    except (subprocess.SubprocessError, OSError) as e:
+        print(f"Error: PyInstaller build failed: {e}")
+        return False
     
     print("Build completed. Check the 'dist' folder for the application.")
     
@@ -105,6 +146,26 @@ if sys.platform == 'darwin':
         create_inno_setup_script()
         print("Inno Setup script (ZeniaSetup.iss) has been created.")
         print("You can now run Inno Setup Compiler to create the installer.")
+    
+    return True
+
+def install_pillow_simd(verbose=False):
+    """
+    Swap stock Pillow for Pillow-SIMD's faster resize kernels.
+    Building it needs a compiler plus libjpeg and zlib; on failure Pillow is restored.
+    """
+    output = None if verbose else subprocess.DEVNULL
+    pip = [sys.executable, "-m", "pip"]
+    print("Installing Pillow-SIMD (builds from source)...")
+    try:
+        subprocess.run(pip + ["uninstall", "-y", "pillow"], check=True, stdout=output)
+        subprocess.run(pip + ["install", "--disable-pip-version-check", "--no-input", "pillow-simd"],
+                       check=True, stdout=output)
+        print("Pillow-SIMD installed.")
+    except (subprocess.SubprocessError, OSError) as e:
+        print(f"Warning: Could not install Pillow-SIMD, keeping stock Pillow: {e}")
+        subprocess.run(pip + ["install", "--disable-pip-version-check", "--no-input", "pillow"],
+                       stdout=output)
 
 def check_and_create_icons():
     # Check for Windows icon
@@ -115,8 +176,9 @@ def check_and_create_icons():
                 # Try to convert PNG to ICO if PIL is available
                 from PIL import Image
                 print("Converting PNG to ICO...")
-                img = Image.open("app_icon.png")
-                img.save("app_icon.ico")
+                img = Image.open("app_icon.png").convert("RGBA")
+                img.save("app_icon.ico", format='ICO',
+                         sizes=[(s, s) for s in (16, 32, 48, 64, 128, 256)])
                 print("Icon created: app_icon.ico")
             except:
                 print("Warning: Could not convert app_icon.png to ICO format.")
@@ -133,15 +195,23 @@ def check_and_create_icons():
                 
                 # Generate different icon sizes
                 sizes = [16, 32, 64, 128, 256, 512, 1024]
+                bucket = {}  # pixel size -> iconset filenames sharing that render
                 for size in sizes:
-                    subprocess.run([
-                        "sips", "-z", str(size), str(size),
-                        "app_icon.png", "--out", f"icon.iconset/icon_{size}x{size}.png"
-                    ])
-                    subprocess.run([
-                        "sips", "-z", str(size*2), str(size*2),
-                        "app_icon.png", "--out", f"icon.iconset/icon_{size}x{size}@2x.png"
-                    ])
+                    bucket.setdefault(size, []).append(f"icon.iconset/icon_{size}x{size}.png")
+                    bucket.setdefault(size*2, []).append(f"icon.iconset/icon_{size}x{size}@2x.png")
+                
+                try:
+                    from PIL import Image
+                    from icon_converter import link_duplicates
+                except ImportError:
+                    # No Pillow yet, fall back to the system's sips tool
+                    render_iconset_with_sips("app_icon.png", bucket)
+                else:
+                    # Decode once and render each unique size in-process
+                    src = Image.open("app_icon.png").convert("RGBA")
+                    for pixels, out_paths in bucket.items():
+                        src.resize((pixels, pixels), Image.LANCZOS).save(out_paths[0], optimize=True)
+                        link_duplicates(out_paths)
                 
                 # Create icns file
                 subprocess.run(["iconutil", "-c", "icns", "icon.iconset"])
@@ -153,6 +223,25 @@ def check_and_create_icons():
                 print("Warning: Could not convert app_icon.png to ICNS format.")
                 print("Please create app_icon.icns manually for macOS builds.")
 
+def render_iconset_with_sips(source, bucket):
+    # One sips process per unique size, fanned out across all cores by xargs
+    jobs = "".join(f"{pixels} {out_paths[0]}\n" for pixels, out_paths in bucket.items())
+    if shutil.which("xargs"):
+        subprocess.run([
+            "xargs", "-P", str(os.cpu_count() or 1), "-L", "1",
+            "sh", "-c", 'sips -z "$1" "$1" "$0" --out "$2" > /dev/null', source
+        ], input=jobs, text=True)
+    else:
+        for pixels, out_paths in bucket.items():
+            subprocess.run([
+                "sips", "-z", str(pixels), str(pixels),
+                source, "--out", out_paths[0]
+            ])
+    
+    for out_paths in bucket.values():
+        for out_path in out_paths[1:]:
+            shutil.copy(out_paths[0], out_path)
+
 def create_inno_setup_script():
     inno_script = """#define MyAppName "ZENIA PDF Processor"
 #define MyAppVersion "1.4"
@@ -199,4 +288,14 @@ Filename: "{app}\\{#MyAppExeName}"; Description: "{cm:LaunchProgram,{#StringChan
         f.write(inno_script)
 
 if __name__ == "__main__":
-    build_app()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build the ZENIA PDF Processor application")
+    parser.add_argument("--clean", action="store_true",
+                        help="Clear the PyInstaller cache and rebuild from scratch")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Show pip output while installing packages")
+    parser.add_argument("--pillow-simd", action="store_true",
+                        help="Replace Pillow with Pillow-SIMD (source build, needs a compiler)")
+    args = parser.parse_args()
+    # A failed build exits non-zero so scripts and CI notice it
+    if not build_app(clean=args.clean, verbose=args.verbose, pillow_simd=args.pillow_simd):
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,59 @@
+# dependencies.py
+# Installed-package checks shared by the build and launch scripts
+
+import re
+import importlib.metadata
+import importlib.util
+
+try:
+    from packaging.specifiers import SpecifierSet
+except ImportError:
+    SpecifierSet = None
+
+# Distribution names whose import name differs
+IMPORT_NAMES = {
+    'pillow': 'PIL',
+    'pillow-simd': 'PIL',
+    'pymupdf': 'fitz',
+    'pyinstaller': 'PyInstaller',
+    'python-dateutil': 'dateutil',
+}
+
+def pillow_simd_installed():
+    """
+    Detect Pillow-SIMD, whose versions carry a .postN suffix (e.g. 9.0.0.post1)
+    """
+    try:
+        import PIL
+    except ImportError:
+        return False
+    return '.post' in PIL.__version__
+
+def version_satisfies(name, specifier):
+    """
+    Check an installed distribution's version against a specifier like '>=6.4'
+    """
+    try:
+        installed = importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return False
+    # Without packaging the version can't be compared, so leave it to pip
+    if SpecifierSet is None:
+        return False
+    return SpecifierSet(specifier).contains(installed, prereleases=True)
+
+def missing(packages):
+    """
+    Return the packages that are not installed, or whose installed version
+    doesn't satisfy their specifier, without importing them
+    """
+    todo = []
+    for package in packages:
+        # Split off any version specifier, e.g. 'pyinstaller>=6.4'
+        name = re.split(r'[<>=!~ ]', package, maxsplit=1)[0]
+        specifier = package[len(name):].strip()
+        if importlib.util.find_spec(IMPORT_NAMES.get(name.lower(), name.replace('-', '_'))) is None:
+            todo.append(package)
+        elif specifier and not version_satisfies(name, specifier):
+            todo.append(package)
+    return todo
@@ -1,26 +1,72 @@
 # icon_converter.py
 # Tool to convert PNG/JPG images to proper icon format for Windows and macOS
 
+import io
 import os
 import sys
+import shutil
 import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 
-def create_windows_icon(input_image, output_icon="app_icon.ico", sizes=[16, 32, 48, 64, 128, 256]):
+def load_rgba(input_image, img=None):
+    """
+    Return a fully decoded RGBA image, reusing img when it is already RGBA
+    """
+    if img is None:
+        img = Image.open(input_image)
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    img.load()
+    return img
+
+def create_windows_icon(input_image, output_icon="app_icon.ico", sizes=[16, 32, 48, 64, 128, 256], img=None):
     """
     Convert an image to Windows ICO format with multiple sizes
+    Pass an already decoded image as img to skip reading input_image from disk
     """
     print(f"Converting {input_image} to Windows icon...")
-    img = Image.open(input_image)
-    
-    # Create a multi-size icon
-    img.save(output_icon, format='ICO', sizes=[(size, size) for size in sizes])
+    img = load_rgba(input_image, img)
+    
+    # Pre-render each size with Lanczos so the ICO writer stores the frames as-is
+    frames = sorted((img.resize((size, size), Image.LANCZOS) for size in sizes),
+                    key=lambda frame: frame.width, reverse=True)
+    
+    # Create a multi-size icon in memory and write it out in one go. The ICO
+    # writer drops sizes larger than the image it saves from, so save from the
+    # largest frame
+    buffer = io.BytesIO()
+    frames[0].save(buffer, format='ICO', sizes=[(size, size) for size in sizes],
+                   append_images=frames[1:])
+    with open(output_icon, "wb") as f:
+        f.write(buffer.getvalue())
     print(f"Windows icon created: {output_icon}")
 
-def create_macos_icon(input_image, output_iconset="icon.iconset", output_icon="app_icon.icns"):
+def link_duplicates(out_paths):
+    """
+    Share the first rendered file with the remaining names (hardlink, or copy)
+    """
+    for out_path in out_paths[1:]:
+        if os.path.exists(out_path):
+            os.remove(out_path)
+        try:
+            os.link(out_paths[0], out_path)
+        except OSError:
+            shutil.copy(out_paths[0], out_path)
+
+def save_resized(src, pixels, out_paths):
+    """
+    Render one iconset size and share it with every filename that needs it
+    """
+    src.resize((pixels, pixels), Image.LANCZOS).save(out_paths[0], optimize=True)
+    link_duplicates(out_paths)
+
+def create_macos_icon(input_image, output_iconset="icon.iconset", output_icon="app_icon.icns", img=None):
     """
     Convert an image to macOS ICNS format
-    Note: This works only on macOS as it requires 'sips' and 'iconutil'
+    Pass an already decoded image as img to skip reading input_image from disk
+    Note: This works only on macOS as it requires 'iconutil'
     """
     if sys.platform != 'darwin':
         print("Error: macOS icon creation is only available on macOS.")
@@ -28,38 +74,45 @@ def create_macos_icon(input_image, output_iconset="icon.iconset", output_icon="a
     
     print(f"Converting {input_image} to macOS icon...")
     
-    # Create iconset directory
-    os.makedirs(output_iconset, exist_ok=True)
-    
-    # Generate different icon sizes
-    sizes = [16, 32, 64, 128, 256, 512, 1024]
-    for size in sizes:
-        subprocess.run([
-            "sips", "-z", str(size), str(size),
-            input_image, "--out", f"{output_iconset}/icon_{size}x{size}.png"
-        ])
+    # Build the iconset under TMPDIR; it is removed along with the directory
+    with tempfile.TemporaryDirectory() as temp_dir:
+        iconset_dir = os.path.join(temp_dir, os.path.basename(output_iconset))
+        os.makedirs(iconset_dir)
         
-        # For Retina/HiDPI (2x) versions
-        if size <= 512:  # 1024px is already the 2x version of 512px
-            subprocess.run([
-                "sips", "-z", str(size*2), str(size*2),
-                input_image, "--out", f"{output_iconset}/icon_{size}x{size}@2x.png"
-            ])
-    
-    # Create ICNS file from iconset
-    subprocess.run(["iconutil", "-c", "icns", output_iconset])
-    
-    # Cleanup the iconset directory if successful
-    if os.path.exists(output_icon):
-        import shutil
-        shutil.rmtree(output_iconset)
-        print(f"macOS icon created: {output_icon}")
-    else:
-        print("Warning: ICNS file creation may have failed.")
+        # Generate different icon sizes
+        sizes = [16, 32, 64, 128, 256, 512, 1024]
+        bucket = {}  # pixel size -> iconset filenames sharing that render
+        for size in sizes:
+            bucket.setdefault(size, []).append(f"{iconset_dir}/icon_{size}x{size}.png")
+            
+            # For Retina/HiDPI (2x) versions
+            if size <= 512:  # 1024px is already the 2x version of 512px
+                bucket.setdefault(size*2, []).append(f"{iconset_dir}/icon_{size}x{size}@2x.png")
+        
+        # Decode the source once and render the sizes concurrently, largest first
+        src = load_rgba(input_image, img)
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = [
+                executor.submit(save_resized, src, pixels, bucket[pixels])
+                for pixels in sorted(bucket, reverse=True)
+            ]
+            for future in futures:
+                future.result()
+        
+        # Create ICNS file from iconset
+        temp_icon = os.path.join(temp_dir, os.path.basename(output_icon))
+        subprocess.run(["iconutil", "-c", "icns", iconset_dir, "-o", temp_icon])
+        
+        if os.path.exists(temp_icon):
+            shutil.move(temp_icon, output_icon)
+            print(f"macOS icon created: {output_icon}")
+        else:
+            print("Warning: ICNS file creation may have failed.")
 
 def optimize_png_for_app(input_image, output_image=None, app_icon_size=256):
     """
     Optimize a PNG for application icons by ensuring proper dimensions and format
+    Returns the output path and the optimized image, still decoded in memory
     """
     if output_image is None:
         # Use the same name but ensure .png extension
@@ -86,7 +139,7 @@ def optimize_png_for_app(input_image, output_image=None, app_icon_size=256):
     new_img.save(output_image, format="PNG")
     print(f"Optimized icon saved to {output_image}")
     
-    return output_image
+    return output_image, new_img
 
 def main():
     # Check for command line arguments
@@ -115,20 +168,24 @@ def main():
         return
     
     # Optimize the image first
-    optimized_image = optimize_png_for_app(input_image)
+    optimized_image, optimized_img = optimize_png_for_app(input_image)
     
-    # Create Windows icon
-    try:
-        create_windows_icon(optimized_image)
-    except Exception as e:
-        print(f"Error creating Windows icon: {e}")
+    # Decode once; both icon builders resize from this shared pixel buffer
+    optimized_img = load_rgba(optimized_image, optimized_img)
     
-    # Create macOS icon if on macOS
-    if sys.platform == 'darwin':
-        try:
-            create_macos_icon(optimized_image)
-        except Exception as e:
-            print(f"Error creating macOS icon: {e}")
+    # The Windows and macOS icons are independent, so build them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = {executor.submit(create_windows_icon, optimized_image, img=optimized_img): "Windows"}
+        
+        # Create macOS icon if on macOS
+        if sys.platform == 'darwin':
+            futures[executor.submit(create_macos_icon, optimized_image, img=optimized_img)] = "macOS"
+        
+        for future, platform_name in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error creating {platform_name} icon: {e}")
     
     print("Icon conversion complete!")
 
@@ -9,27 +9,23 @@ import sys
 import os
 import webbrowser
 import time
+import urllib.error
+import urllib.request
 from pathlib import Path
 
+from dependencies import missing
+
 def check_dependencies():
     """Check if required dependencies are installed"""
     required_packages = [
-        'streamlit',
+        'streamlit>=1.37.0',  # st.fragment(run_every=...)
         'pandas', 
         'pillow',
         'pymupdf',
         'openpyxl'
     ]
     
-    missing_packages = []
-    
-    for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
-            missing_packages.append(package)
-    
-    return missing_packages
+    return missing(required_packages)
 
 def install_dependencies(packages):
     """Install missing dependencies"""
@@ -59,6 +55,19 @@ def check_files():
     
     return missing_files
 
+def wait_for_server(url, timeout=15):
+    """Poll the URL until it responds with 200 or the timeout elapses"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=0.2) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.1)
+    return False
+
 def launch_streamlit():
     """Launch the Streamlit application"""
     print("🚀 Launching ZENIA PDF Processor Web App...")
@@ -73,11 +82,15 @@ def launch_streamlit():
             sys.executable, '-m', 'streamlit', 'run', 'streamlit_app.py',
             '--server.address', 'localhost',
             '--server.port', '8501',
-            '--browser.gatherUsageStats', 'false'
+            '--browser.gatherUsageStats', 'false',
+            # We open the browser ourselves and don't need live reload
+            '--server.headless', 'true',
+            '--server.fileWatcherType', 'none',
+            '--server.runOnSave', 'false'
         ])
         
-        # Wait a moment for the server to start
-        time.sleep(3)
+        # Wait until the server answers its health check
+        wait_for_server('http://localhost:8501/_stcore/health')
         
         # Open browser
         webbrowser.open('http://localhost:8501')
@@ -1,19 +1,45 @@
 import os
 import re
-import csv
+import sys
 import datetime
 import subprocess
 import platform
+import threading
 import time
+import multiprocessing
+from array import array
 from collections import defaultdict, deque
+from contextlib import nullcontext
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 import fitz  # PyMuPDF
+import numpy as np
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.utils import get_column_letter
 
 # Define hazmat-related keywords
 HAZMAT_KEYWORDS = ["deo", "deodorant", "perfume", "parfum", "freshener", "edp", "edt", "extrait"]
 
+# Pick list styles, shared by every cell that uses them
+PICKLIST_TITLE_FONT = Font(name="Arial", size=16, bold=True)
+PICKLIST_HEADER_FONT = Font(name="Arial", size=14, bold=True)
+PICKLIST_CONTENT_FONT = Font(name="Arial", size=13)
+PICKLIST_QTY_FONT = Font(name="Arial", size=13, bold=True)  # Bold for qty
+PICKLIST_LIGHT_FILL = PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")
+PICKLIST_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+PICKLIST_CENTER = Alignment(horizontal='center')
+PICKLIST_CENTER_MIDDLE = Alignment(horizontal='center', vertical='center')
+PICKLIST_WRAP_MIDDLE = Alignment(wrap_text=True, vertical='center')
+PICKLIST_MIDDLE = Alignment(vertical='center')
+
 # Performance optimization: Compile regex patterns once
 SKU_QTY_PATTERN = re.compile(r'(T\d+)\s+(\d+)')
 ORDER_ID_PATTERN = re.compile(r"Order ID:[\s]*(\d+)")
@@ -23,38 +49,92 @@ TRACKING_PATTERNS = [
     re.compile(r"TRK\s*#:?\s*([A-Za-z0-9]+)", re.IGNORECASE)
 ]
 QTY_TOTAL_PATTERN = re.compile(r"Qty\s+Total:\s+(\d+)", re.IGNORECASE)
+HEADER_END_PATTERN = re.compile(r"Seller SKU.*?Qty", re.DOTALL)
+SKU_LINE_PATTERN = re.compile(r"^.*(?:SKU|Seller).*\n?", re.MULTILINE)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Pick list CSV formatting, matching csv.writer's default excel dialect
+CSV_LINE_END = "\r\n"
+CSV_QUOTE_PATTERN = re.compile(r'[,"\r\n]')  # Fields containing these get quoted
+CSV_COLUMN_HEADER = "SKU,Product Name,Variation,Quantity" + CSV_LINE_END
+
+# Pick list CSV layout: (title, packing room category) for each pick list,
+# each split into (title, subcategory) sections
+CSV_PICK_LISTS = (
+    ("HAZMAT PICK LIST", 'hazmat'),
+    ("GROUND PICK LIST", 'ground'),
+)
+CSV_SECTIONS = (
+    ("SINGLE ITEM ORDERS", 'single_item'),
+    ("SINGLE SKU ORDERS (MULTI QTY)", 'single_sku'),
+    ("MULTI SKU ORDERS", 'multi_sku'),
+)
+
+# Minimum pages per worker before page extraction is spread over processes
+PARALLEL_PAGE_THRESHOLD = 32
+
+# Worker processes are started fresh instead of forked: the web app calls in
+# from a thread of its multithreaded server, where fork() is unsafe. The
+# forkserver imports this module once, so each worker doesn't re-import it
+if os.name == "nt":
+    POOL_CONTEXT = multiprocessing.get_context("spawn")
+else:
+    POOL_CONTEXT = multiprocessing.get_context("forkserver")
+    POOL_CONTEXT.set_forkserver_preload([__name__])
+
+def pool_workers(jobs):
+    """
+    Number of worker processes to use for jobs independent tasks (1 means run
+    in this process). Frozen builds have no freeze_support() entry point, so a
+    worker would start the whole application again; they never use a pool
+    """
+    if getattr(sys, 'frozen', False):
+        return 1
+    return min(os.cpu_count() or 1, jobs)
+
+# Common indicators of a packing slip
+PACKING_SLIP_INDICATORS = frozenset([
+    "Order ID:",
+    "Product Name",
+    "SKU",
+    "Qty Total:",
+    "Packing Slip",
+    "Ship To:"
+])
+
+# Common indicators of a shipping label
+LABEL_INDICATORS = frozenset([
+    "SHIP FROM:",
+    "DELIVER TO:",
+    "Tracking Number:",
+    "Carrier:",
+    "Service:"
+])
+
+# All indicators in one alternation so each page is scanned once
+# (no indicator contains another, so matches never overlap)
+PAGE_INDICATOR_PATTERN = re.compile(
+    "|".join(re.escape(indicator) for indicator in PACKING_SLIP_INDICATORS | LABEL_INDICATORS)
+)
 
 def detect_page_type(page_text):
     """
     Detect if a page is a shipping label or packing slip.
     Returns: 'label' or 'packing_slip'
     """
-    # Common indicators of a packing slip
-    packing_slip_indicators = [
-        "Order ID:",
-        "Product Name",
-        "SKU",
-        "Qty Total:",
-        "Packing Slip",
-        "Ship To:"
-    ]
-    
-    # Common indicators of a shipping label
-    label_indicators = [
-        "SHIP FROM:",
-        "DELIVER TO:",
-        "Tracking Number:",
-        "Carrier:",
-        "Service:"
-    ]
+    # Collect the distinct indicators present in a single pass
+    found = set()
+    for match in PAGE_INDICATOR_PATTERN.finditer(page_text):
+        found.add(match.group(0))
+        
+        # If it has product listings, it's definitely a packing slip;
+        # stop scanning as soon as both have been seen
+        if "Product Name" in found and "SKU" in found:
+            return "packing_slip"
     
     # Count indicators
-    packing_slip_count = sum(1 for indicator in packing_slip_indicators if indicator in page_text)
-    label_count = sum(1 for indicator in label_indicators if indicator in page_text)
-    
-    # If it has product listings, it's definitely a packing slip
-    if "Product Name" in page_text and "SKU" in page_text:
-        return "packing_slip"
+    packing_slip_count = len(found & PACKING_SLIP_INDICATORS)
+    label_count = len(found & LABEL_INDICATORS)
     
     # Otherwise, use the indicator counts
     if packing_slip_count > label_count:
@@ -62,23 +142,70 @@ def detect_page_type(page_text):
     else:
         return "label"
 
-def group_label_with_packing_slips(pdf_document):
+def classify_page_range(pdf_path, start, stop):
+    """
+    Extract and classify pages start..stop-1 of the PDF at pdf_path.
+    Runs in a worker process, so it opens its own copy of the document.
+    Returns two parallel lists: page types and page texts
+    """
+    with fitz.open(pdf_path) as pdf_document:
+        page_texts = [pdf_document[i].get_text() for i in range(start, stop)]
+    page_types = [detect_page_type(page_text) for page_text in page_texts]
+    return page_types, page_texts
+
+def classify_pages(pdf_document, parallel=True, status_callback=None):
+    """
+    Extract the text of every page once and detect its type.
+    Large PDFs are split into page ranges handled by a process pool,
+    unless parallel is False.
+    Returns two parallel lists: page types and page texts
+    """
+    total_pages = len(pdf_document)
+    pdf_path = pdf_document.name
+    workers = pool_workers(-(-total_pages // PARALLEL_PAGE_THRESHOLD)) if parallel else 1
+    
+    if workers > 1 and pdf_path and os.path.isfile(pdf_path):
+        chunk_size = -(-total_pages // workers)  # Ceiling division
+        starts = list(range(0, total_pages, chunk_size))
+        stops = [min(start + chunk_size, total_pages) for start in starts]
+        try:
+            with ProcessPoolExecutor(max_workers=len(starts), mp_context=POOL_CONTEXT) as executor:
+                results = list(executor.map(classify_page_range, [pdf_path] * len(starts), starts, stops))
+        except Exception as e:
+            results = None  # Fall back to extracting in this process
+            if status_callback:
+                status_callback(f"  - Warning: parallel page reading failed, reading pages directly: {e}")
+        
+        if results is not None:
+            page_types, page_texts = [], []
+            for range_types, range_texts in results:
+                page_types.extend(range_types)
+                page_texts.extend(range_texts)
+            return page_types, page_texts
+    
+    page_texts = [page.get_text() for page in pdf_document]
+    page_types = [detect_page_type(page_text) for page_text in page_texts]
+    return page_types, page_texts
+
+def group_label_with_packing_slips(pdf_document, page_types=None):
     """
     Group labels with their corresponding packing slips.
+    Pass page_types from classify_pages to avoid extracting the text again.
     Returns a list of dictionaries with label and packing slip information
     """
+    if page_types is None:
+        page_types, _ = classify_pages(pdf_document)
+    
     groups = []
     i = 0
     total_pages = len(pdf_document)
     
     while i < total_pages:
-        page = pdf_document[i]
-        page_text = page.get_text()
-        page_type = detect_page_type(page_text)
+        page_type = page_types[i]
         
         if page_type == "label":
             # Found a label, now collect all following packing slips
-            label_page = page
+            label_page = pdf_document[i]
             label_index = i
             packing_slips = []
             packing_slip_indices = []
@@ -86,13 +213,11 @@ def group_label_with_packing_slips(pdf_document):
             # Look ahead for packing slips
             j = i + 1
             while j < total_pages:
-                next_page = pdf_document[j]
-                next_text = next_page.get_text()
-                next_type = detect_page_type(next_text)
+                next_type = page_types[j]
                 
                 if next_type == "packing_slip":
                     # Add this packing slip to the group
-                    packing_slips.append(next_page)
+                    packing_slips.append(pdf_document[j])
                     packing_slip_indices.append(j)
                     j += 1
                 else:
@@ -116,13 +241,20 @@ def group_label_with_packing_slips(pdf_document):
     
     return groups
 
-def add_page_number_with_slip_count(page, page_number, slip_number, total_slips):
+def page_dimensions(page):
+    """
+    Return (width, height) of a page, reading its rect only once.
+    Pass the result as page_size to the annotate helpers below.
+    """
+    rect = page.rect
+    return rect.width, rect.height
+
+def add_page_number_with_slip_count(page, page_number, slip_number, total_slips, page_size=None):
     """
     Add page number with packing slip count for multi-slip orders.
     e.g., "Page: 42 (Slip 1 of 3)"
     """
-    page_width = page.rect.width
-    page_height = page.rect.height
+    page_width, page_height = page_size or page_dimensions(page)
     
     x = page_width - 120  # Adjusted for longer text
     y = page_height - 20
@@ -147,62 +279,60 @@ def extract_items(page_content):
     if qty_total_position == -1:
         qty_total_position = len(page_content)
     
-    # Extract just the product section
-    product_section = page_content[product_section_start:qty_total_position]
+    # Search the product section in place (pos/endpos) rather than slicing
+    # a copy of it out of the page text
+    section_bounds = (product_section_start, qty_total_position)
     
-    # Find all SKUs and quantities using compiled regex for speed
-    sku_qty_matches = list(SKU_QTY_PATTERN.finditer(product_section))
+    # For the first item, names start after "Product Name SKU Seller SKU Qty"
+    header_match = HEADER_END_PATTERN.search(page_content, *section_bounds)
     
     items = []
+    previous_end = None
     
-    for i, match in enumerate(sku_qty_matches):
+    # Walk the SKU/quantity matches once, carrying the end of the previous match
+    for match in SKU_QTY_PATTERN.finditer(page_content, *section_bounds):
         sku = match.group(1)
         qty = int(match.group(2))
         
         # Find the start position for the product name
-        if i == 0:
-            # For the first item, start after "Product Name SKU Seller SKU Qty"
-            header_end = product_section.find("Qty", product_section.find("Seller SKU"))
-            if header_end == -1:
+        if previous_end is None:
+            if header_match is None:
+                previous_end = match.end()
                 continue
-            name_start = header_end + 3  # Length of "Qty"
+            name_start = header_match.end()
         else:
             # For subsequent items, start after the previous match
-            name_start = sku_qty_matches[i-1].end()
-        
-        # Find the end position for the product name (just before "Default" or other variation)
-        name_end = match.start()
+            name_start = previous_end
+        previous_end = match.end()
         
-        # Extract the raw product text
-        product_text = product_section[name_start:name_end].strip()
+        # Extract the raw product text (just before the SKU)
+        product_text = page_content[name_start:match.start()].strip()
         
         # Extract variation (text right before the SKU)
-        variation = ""
         # Look for "Default" before the SKU
         default_pos = product_text.rfind("Default")
         if default_pos != -1:
             # "Default" is the variation
             variation = "Default"
             # Remove "Default" and get the actual product name
-            product_name = product_text[:default_pos].strip()
+            product_name = product_text[:default_pos]
         else:
-            # If not "Default", check for any text in the last line as possible variation
-            lines = product_text.split('\n')
-            if lines:
-                variation = lines[-1].strip()
-                product_name = '\n'.join(lines[:-1]).strip() if len(lines) > 1 else product_text
-                
-                # If the last line contains the SKU pattern (might be captured in product_text), clean it
-                if SKU_QTY_PATTERN.search(variation):
-                    variation = ""
-                    product_name = product_text
+            # If not "Default", use the last line as the possible variation
+            head, newline, last_line = product_text.rpartition('\n')
+            variation = last_line.strip()
+            product_name = head if newline else product_text
+            
+            # If the last line contains the SKU pattern (might be captured in product_text), clean it
+            if SKU_QTY_PATTERN.search(variation):
+                variation = ""
+                product_name = product_text
         
         # Clean up product name (remove any line with SKU/Seller SKU)
-        product_name = '\n'.join(line for line in product_name.split('\n') 
-                               if not any(kw in line for kw in ["SKU", "Seller"]))
+        product_name = SKU_LINE_PATTERN.sub('', product_name)
         
-        # Join multi-line product names with spaces
-        product_name = ' '.join(product_name.split())
+        # Join multi-line product names with spaces; this also trims the ends,
+        # so names and variations leave here already stripped
+        product_name = WHITESPACE_PATTERN.sub(' ', product_name).strip()
         
         items.append({
             "product_name": product_name,
@@ -213,6 +343,34 @@ def extract_items(page_content):
     
     return items
 
+@lru_cache(maxsize=32)
+def compile_hazmat_pattern(hazmat_keywords):
+    """
+    Compile a tuple of hazmat keywords into one case-folded alternation pattern.
+    Returns None when there are no keywords. Cached, so repeated runs with the
+    same keyword list reuse the compiled pattern.
+    """
+    if not hazmat_keywords:
+        return None
+    
+    # A keyword containing another one can never decide a match on its own
+    # ("deodorant" is found wherever "deo" is), so only the shortest are kept
+    keywords = list(dict.fromkeys(keyword.lower() for keyword in hazmat_keywords))
+    keywords = [keyword for keyword in keywords
+                if not any(other != keyword and other in keyword for other in keywords)]
+    return re.compile("|".join(map(re.escape, sorted(keywords, key=len, reverse=True))))
+
+def contains_hazmat_keyword(page_text, hazmat_pattern):
+    """
+    Check page text for any hazmat keyword in a single case-insensitive scan.
+    """
+    if hazmat_pattern is None:
+        return False
+    # One lower() per page; searching that with a plain pattern is several
+    # times faster than re.IGNORECASE on the original text, since the regex
+    # engine can then use its literal-prefix fast path
+    return hazmat_pattern.search(page_text.lower()) is not None
+
 def extract_order_id(page_text):
     """
     Extract the order ID from page text.
@@ -239,40 +397,84 @@ def add_hazmat_image_to_page(page, image_path, image_width=232, image_height=100
     """
     Add the hazmat image to the bottom center of a PDF page using PyMuPDF.
     """
-    if not os.path.exists(image_path):
+    image_data = load_hazmat_image(image_path)
+    if image_data is None:
         return  # Skip if image doesn't exist
-        
-    x = (page.rect.width - image_width) / 7
-    y = page.rect.height - image_height - 0.5  # 0.5 units from the bottom
-    rect = fitz.Rect(x, y, x + image_width, y + image_height)
-    page.insert_image(rect, filename=image_path)
+    
+    rect = hazmat_image_rect(*page_dimensions(page), image_width, image_height)
+    page.insert_image(rect, stream=image_data)
+
+@lru_cache(maxsize=None)
+def load_hazmat_image(image_path):
+    """
+    Read the hazmat image once, or return None if it doesn't exist
+    """
+    if not os.path.exists(image_path):
+        return None
+    with open(image_path, "rb") as f:
+        return f.read()
+
+@lru_cache(maxsize=None)
+def hazmat_image_rect(page_width, page_height, image_width, image_height):
+    """
+    Placement of the hazmat image, computed once per page size
+    """
+    x = (page_width - image_width) / 7
+    y = page_height - image_height - 0.5  # 0.5 units from the bottom
+    return (x, y, x + image_width, y + image_height)
+
+# Size of the pre-rendered "MULTI-QUANTITY ORDER" overlay, which covers the
+# bottom-left corner of a packing slip
+MULTI_QTY_OVERLAY_WIDTH = 250
+MULTI_QTY_OVERLAY_HEIGHT = 100
+
+# The cached overlay document is shared by every thread in the process (the
+# web app runs batches on a thread pool) and PyMuPDF documents aren't
+# thread-safe, so building and stamping it is serialized
+MULTI_QTY_OVERLAY_LOCK = threading.Lock()
+
+@lru_cache(maxsize=None)
+def multi_qty_overlay():
+    """
+    Render the "MULTI-QUANTITY ORDER" alert once into a small in-memory PDF,
+    so each packing slip only needs a reference to it
+    """
+    overlay = fitz.open()
+    page = overlay.new_page(width=MULTI_QTY_OVERLAY_WIDTH, height=MULTI_QTY_OVERLAY_HEIGHT)
+    
+    # Position at the bottom of the page (1 inch from bottom)
+    header_x = 50  # Left margin
+    header_y = MULTI_QTY_OVERLAY_HEIGHT - 72  # 1 inch (72 points) from bottom
+    
+    # Add header text in bold; the "hebo" alias keeps the overlay's font
+    # resource from shadowing the "Helvetica-Bold" one used for page numbers
+    page.insert_text((header_x, header_y), "MULTI-QUANTITY ORDER",
+                    fontname="hebo", fontsize=14, color=(0, 0, 0))
+    
+    # Underline the text
+    text_width = 180  # Approximate width of the text
+    page.draw_line((header_x, header_y + 5), (header_x + text_width, header_y + 5), 
+                  width=1.5, color=(0, 0, 0))
+    return overlay
 
 def add_multi_qty_header(page, items):
     """
     Add a bold "MULTI-QUANTITY ORDER" alert at the bottom of packing slips with multiple quantities
     """
     if any(item['qty'] > 1 for item in items):
-        # Position at the bottom of the page (1 inch from bottom)
+        # Stamp the pre-rendered alert unscaled onto the bottom-left corner
         page_height = page.rect.height
-        header_x = 50  # Left margin
-        header_y = page_height - 72  # 1 inch (72 points) from bottom
-        
-        # Add header text in bold
-        page.insert_text((header_x, header_y), "MULTI-QUANTITY ORDER",
-                        fontname="Helvetica-Bold", fontsize=14, color=(0, 0, 0))
-        
-        # Underline the text
-        text_width = 180  # Approximate width of the text
-        page.draw_line((header_x, header_y + 5), (header_x + text_width, header_y + 5), 
-                      width=1.5, color=(0, 0, 0))
+        rect = fitz.Rect(0, page_height - MULTI_QTY_OVERLAY_HEIGHT,
+                         MULTI_QTY_OVERLAY_WIDTH, page_height)
+        with MULTI_QTY_OVERLAY_LOCK:
+            page.show_pdf_page(rect, multi_qty_overlay(), 0)
 
-def add_page_number(page, page_number):
+def add_page_number(page, page_number, page_size=None):
     """
     Add page number to the bottom right corner of the page in bold
     Adjusted position and font size for better visibility
     """
-    page_width = page.rect.width
-    page_height = page.rect.height
+    page_width, page_height = page_size or page_dimensions(page)
     
     # Position at the bottom right of the page
     x = page_width - 65  
@@ -282,13 +484,12 @@ def add_page_number(page, page_number):
     page.insert_text((x, y), f"Page: {page_number}",
                      fontname="Helvetica-Bold", fontsize=8, color=(0, 0, 0))
 
-def add_label_count(page, sku, current_count, total_count):
+def add_label_count(page, sku, current_count, total_count, page_size=None):
     """
     Add label count (e.g., "SKU: T123 (1 of 5)") to packing slips for SKUs with qty >= 5
     Placed at the bottom left of the packing slip
     """
-    page_width = page.rect.width
-    page_height = page.rect.height
+    _, page_height = page_size or page_dimensions(page)
     
     # Position at the bottom left of the page
     x = 50  # 50 points from left edge
@@ -317,63 +518,53 @@ def sort_orders(orders):
     
     Returns orders in two groups: warehouse and packingroom
     """
-    # Count occurrences of each SKU across all orders with Qty Total = 1
+    # Count occurrences of each SKU across all orders with Qty Total = 1,
+    # remembering the first single-item order seen for each SKU
     sku_occurrences = defaultdict(int)
+    first_single_item_orders = {}
     for order in orders:
-        if order['qty_total'] == 1 and len(order['items']) == 1:
-            sku_occurrences[order['items'][0]['sku']] += 1
+        if len(order['items']) == 1:
+            sku = order['items'][0]['sku']
+            first_single_item_orders.setdefault(sku, order)
+            if order['qty_total'] == 1:
+                sku_occurrences[sku] += 1
     
     # Check for high-quantity SKUs (100+ occurrences)
     high_qty_skus = {}
     for sku, count in sku_occurrences.items():
         if count >= 100:
-            # Find the first order with this SKU to get the product name
-            for order in orders:
-                if len(order['items']) == 1 and order['items'][0]['sku'] == sku:
-                    high_qty_skus[sku] = {
-                        'count': count,
-                        'product_name': order['items'][0]['product_name'],
-                        'is_hazmat': order.get('is_hazmat', False),
-                        'orders': []
-                    }
-                    break
+            # Take the product name from the first order with this SKU
+            order = first_single_item_orders[sku]
+            high_qty_skus[sku] = {
+                'count': count,
+                'product_name': order['items'][0]['product_name'],
+                'is_hazmat': order.get('is_hazmat', False),
+                'orders': []
+            }
     
     # Create fingerprints for orders to identify identical ones
     order_fingerprints = {}
     for i, order in enumerate(orders):
-        # Create a fingerprint based on SKUs and quantities
-        items_info = sorted([(item['sku'], item['qty']) for item in order['items']])
-        fingerprint = tuple(items_info)
-        
-        if fingerprint not in order_fingerprints:
-            order_fingerprints[fingerprint] = []
-        order_fingerprints[fingerprint].append(i)
+        # Create a fingerprint based on SKUs and quantities, computed once per order
+        fingerprint = tuple(sorted((item['sku'], item['qty']) for item in order['items']))
+        order['fingerprint'] = fingerprint
+        order_fingerprints.setdefault(fingerprint, []).append(i)
     
     # Count frequency of each order fingerprint
     fingerprint_counts = {fp: len(indices) for fp, indices in order_fingerprints.items()}
     
-    # Separate warehouse and packing room orders
-    warehouse_hazmat = []
-    warehouse_ground = []
-    
-    # For packing room, separate into categories
-    packingroom_hazmat_single_item = []  # 1 item, qty=1
-    packingroom_hazmat_single_sku = []   # 1 SKU, multiple qty
-    packingroom_hazmat_multi_sku = []    # Multiple SKUs
-    
-    packingroom_ground_single_item = []  # 1 item, qty=1
-    packingroom_ground_single_sku = []   # 1 SKU, multiple qty
-    packingroom_ground_multi_sku = []    # Multiple SKUs
-    
-    # First, collect high quantity SKU orders if they exist
-    for sku, info in high_qty_skus.items():
-        high_qty_skus[sku]['orders'] = []
+    # Warehouse and packing room orders are collected as (sort key, order)
+    # pairs and sorted once each. Warehouse key: (0 hazmat / 1 ground,
+    # -SKU frequency). Packing room key: (bucket, -order frequency) where
+    # bucket = 0 hazmat / 3 ground plus 0 single item (1 item, qty=1),
+    # 1 single SKU (1 SKU, multiple qty) or 2 multi SKU
+    warehouse_entries = []
+    packingroom_entries = []
     
     # Sort orders into appropriate categories
     for i, order in enumerate(orders):
         # Skip duplicates to process them together with their first occurrence
-        fingerprint = tuple(sorted([(item['sku'], item['qty']) for item in order['items']]))
-        fingerprint_indices = order_fingerprints[fingerprint]
+        fingerprint_indices = order_fingerprints[order['fingerprint']]
         if i != fingerprint_indices[0]:
             continue
             
@@ -389,53 +580,43 @@ def sort_orders(orders):
         # Check for warehouse eligibility (SKUs with 5+ occurrences, qty=1)
         if (len(order['items']) == 1 and order['qty_total'] == 1 and 
             sku_occurrences[order['items'][0]['sku']] >= 5):
-            # Add all identical orders
-            identical_orders = [orders[idx] for idx in fingerprint_indices]
-            
-            if order.get('is_hazmat', False):
-                warehouse_hazmat.extend(identical_orders)
-            else:
-                warehouse_ground.extend(identical_orders)
+            # Add all identical orders, hazmat first, then by frequency (descending)
+            sort_key = (0 if order.get('is_hazmat', False) else 1,
+                        -sku_occurrences[order['items'][0]['sku']])
+            warehouse_entries.extend((sort_key, orders[idx]) for idx in fingerprint_indices)
         else:
-            # Add to packing room
-            identical_orders = [orders[idx] for idx in fingerprint_indices]
-            
-            if order.get('is_hazmat', False):
-                # Categorize hazmat orders
-                if len(order['items']) == 1:
-                    if order['qty_total'] == 1:
-                        packingroom_hazmat_single_item.extend(identical_orders)
-                    else:
-                        packingroom_hazmat_single_sku.extend(identical_orders)
-                else:
-                    packingroom_hazmat_multi_sku.extend(identical_orders)
+            # Add to packing room, categorized by hazmat and order shape
+            if len(order['items']) == 1:
+                bucket = 0 if order['qty_total'] == 1 else 1
             else:
-                # Categorize ground orders
-                if len(order['items']) == 1:
-                    if order['qty_total'] == 1:
-                        packingroom_ground_single_item.extend(identical_orders)
-                    else:
-                        packingroom_ground_single_sku.extend(identical_orders)
-                else:
-                    packingroom_ground_multi_sku.extend(identical_orders)
+                bucket = 2
+            if not order.get('is_hazmat', False):
+                bucket += 3
+            
+            # Identical orders stay together, most frequent first
+            sort_key = (bucket, -fingerprint_counts[order['fingerprint']])
+            packingroom_entries.extend((sort_key, orders[idx]) for idx in fingerprint_indices)
     
-    # Sort warehouse orders by frequency (descending)
-    warehouse_hazmat.sort(key=lambda x: -sku_occurrences[x['items'][0]['sku']])
-    warehouse_ground.sort(key=lambda x: -sku_occurrences[x['items'][0]['sku']])
+    # One stable sort per area keeps first-seen order among equal keys
+    warehouse_entries.sort(key=itemgetter(0))
+    packingroom_entries.sort(key=itemgetter(0))
     
-    # Function to get order frequency for sorting
-    def get_order_frequency(order):
-        fingerprint = tuple(sorted([(item['sku'], item['qty']) for item in order['items']]))
-        return fingerprint_counts[fingerprint]
+    # Split the sorted entries back into their categories
+    warehouse_hazmat = []
+    warehouse_ground = []
+    for (bucket, _), order in warehouse_entries:
+        (warehouse_hazmat if bucket == 0 else warehouse_ground).append(order)
     
-    # Sort packing room orders by frequency (descending) within each category
-    packingroom_hazmat_single_item.sort(key=get_order_frequency, reverse=True)
-    packingroom_hazmat_single_sku.sort(key=get_order_frequency, reverse=True)
-    packingroom_hazmat_multi_sku.sort(key=get_order_frequency, reverse=True)
+    packingroom_buckets = [[] for _ in range(6)]
+    for (bucket, _), order in packingroom_entries:
+        packingroom_buckets[bucket].append(order)
     
-    packingroom_ground_single_item.sort(key=get_order_frequency, reverse=True)
-    packingroom_ground_single_sku.sort(key=get_order_frequency, reverse=True)
-    packingroom_ground_multi_sku.sort(key=get_order_frequency, reverse=True)
+    (packingroom_hazmat_single_item,
+     packingroom_hazmat_single_sku,
+     packingroom_hazmat_multi_sku,
+     packingroom_ground_single_item,
+     packingroom_ground_single_sku,
+     packingroom_ground_multi_sku) = packingroom_buckets
     
     # Combine all packing room orders in the correct order
     packingroom_hazmat = (packingroom_hazmat_single_item + 
@@ -478,6 +659,97 @@ def sort_orders(orders):
         'all': all_orders
     }
 
+def compress_page_ranges(pages):
+    """
+    Format page numbers as sorted ranges, e.g. [5, 1, 2, 3, 7] -> "1-3, 5, 7"
+    """
+    if not pages:
+        return ""
+    
+    # Range boundaries are wherever consecutive sorted pages differ by more than 1
+    page_array = np.sort(np.asarray(pages, dtype=np.int64))
+    breaks = np.flatnonzero(np.diff(page_array) != 1)
+    starts = np.concatenate(([page_array[0]], page_array[breaks + 1]))
+    ends = np.concatenate((page_array[breaks], [page_array[-1]]))
+    
+    return ", ".join(str(start) if start == end else f"{start}-{end}"
+                     for start, end in zip(starts.tolist(), ends.tolist()))
+
+def styled_cell(worksheet, value, font, alignment, border=None, fill=None):
+    """
+    Create a write-only cell with the given styles
+    """
+    cell = WriteOnlyCell(worksheet, value=value)
+    cell.font = font
+    cell.alignment = alignment
+    if border is not None:
+        cell.border = border
+    if fill is not None:
+        cell.fill = fill
+    return cell
+
+def append_picklist_title(worksheet, row_idx, title):
+    """
+    Append a centered title merged across the pick list columns (A-F)
+    """
+    worksheet.merged_cells.add(f'A{row_idx}:F{row_idx}')
+    worksheet.append([styled_cell(worksheet, title, PICKLIST_TITLE_FONT, PICKLIST_CENTER)])
+
+def write_picklist_section(worksheet, orders, row_idx):
+    """
+    Group the orders' items by SKU and append one pick list row per SKU,
+    starting at row_idx. Returns the next free row.
+    """
+    # Group items by SKU with page number tracking, as [product name,
+    # quantity, pages] entries; pages are kept in a compact int array that
+    # compress_page_ranges sorts in C
+    items_by_sku = {}
+    
+    for order in orders:
+        page_number = order.get('page_number')
+        for item in order['items']:
+            data = items_by_sku.get(item['sku'])
+            if data is None:
+                # Include variation in product name if present (first occurrence wins)
+                variation = item.get('variation', '')
+                product_name = f"{variation} {item['product_name']}" if variation else item['product_name']
+                data = items_by_sku[item['sku']] = [product_name, 0, array('i')]
+            # Add to total quantity
+            data[1] += item['qty']
+            # Add page number to list
+            if page_number is not None:
+                data[2].append(page_number)
+    
+    # Add grouped items to the worksheet
+    for row_counter, (sku, (product_name, quantity, pages)) in enumerate(items_by_sku.items()):
+        # Apply alternating row background
+        fill = PICKLIST_LIGHT_FILL if row_counter % 2 == 1 else None  # Odd rows get shaded
+        
+        # Sort page numbers and create ranges
+        page_text = compress_page_ranges(pages)
+        
+        # Add row to worksheet - Name, Qty, SKU, Pages, Picked by, Packed by
+        # (the last two are columns for employee tracking)
+        worksheet.row_dimensions[row_idx].height = 35  # Accommodate wrapped text
+        worksheet.append([
+            styled_cell(worksheet, product_name, PICKLIST_CONTENT_FONT,
+                        PICKLIST_WRAP_MIDDLE, PICKLIST_BORDER, fill),
+            styled_cell(worksheet, quantity, PICKLIST_QTY_FONT,
+                        PICKLIST_CENTER_MIDDLE, PICKLIST_BORDER, fill),
+            styled_cell(worksheet, sku, PICKLIST_CONTENT_FONT,
+                        PICKLIST_MIDDLE, PICKLIST_BORDER, fill),
+            styled_cell(worksheet, page_text, PICKLIST_CONTENT_FONT,
+                        PICKLIST_MIDDLE, PICKLIST_BORDER, fill),
+            styled_cell(worksheet, "", PICKLIST_CONTENT_FONT,
+                        PICKLIST_CENTER_MIDDLE, PICKLIST_BORDER, fill),
+            styled_cell(worksheet, "", PICKLIST_CONTENT_FONT,
+                        PICKLIST_CENTER_MIDDLE, PICKLIST_BORDER, fill),
+        ])
+        
+        row_idx += 1
+    
+    return row_idx
+
 def create_warehouse_picklist_excel(warehouse_orders, output_path):
     """
     Create a properly formatted Excel file with the warehouse pick list
@@ -491,10 +763,12 @@ def create_warehouse_picklist_excel(warehouse_orders, output_path):
     - Centered and bold qty values
     - Added "Picked by" and "Packed by" columns for employee tracking
     - Optimized for letter-size printing
+    
+    Rows are streamed with a write-only workbook, so column widths, merged
+    ranges and row heights are declared before the rows they apply to.
     """
-    workbook = Workbook()
-    worksheet = workbook.active
-    worksheet.title = "Warehouse Pick List"
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Warehouse Pick List")
     
     # Set column widths for letter size paper (8.5" x 11") with new columns
     worksheet.column_dimensions['A'].width = 45  # Item Name (slightly reduced to fit new columns)
@@ -504,253 +778,66 @@ def create_warehouse_picklist_excel(warehouse_orders, output_path):
     worksheet.column_dimensions['E'].width = 15  # Picked by
     worksheet.column_dimensions['F'].width = 15  # Packed by
     
-    # Create fonts
-    title_font = Font(name="Arial", size=16, bold=True)
-    header_font = Font(name="Arial", size=14, bold=True)
-    content_font = Font(name="Arial", size=13)
-    product_name_font = Font(name="Arial", size=13)
-    qty_font = Font(name="Arial", size=13, bold=True)  # Bold for qty
-    
-    # Create fills for alternating rows
-    light_fill = PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")
-    
     # Add HAZMAT PICK LIST header (merged cells A1-F1)
-    worksheet.merge_cells('A1:F1')
-    worksheet['A1'] = "HAZMAT PICK LIST"
-    worksheet['A1'].font = title_font
-    worksheet['A1'].alignment = Alignment(horizontal='center')
+    append_picklist_title(worksheet, 1, "HAZMAT PICK LIST")
     
     # Add today's date (merged cells A2-F2)
-    worksheet.merge_cells('A2:F2')
-    worksheet['A2'] = datetime.datetime.now().strftime("%Y-%m-%d")
-    worksheet['A2'].font = content_font
-    worksheet['A2'].alignment = Alignment(horizontal='center')
+    worksheet.merged_cells.add('A2:F2')
+    worksheet.append([styled_cell(worksheet, datetime.datetime.now().strftime("%Y-%m-%d"),
+                                  PICKLIST_CONTENT_FONT, PICKLIST_CENTER)])
     
     # Add column headers
     headers = ["Item Name", "Qty", "SKU", "Pages", "Picked by", "Packed by"]
-    for col, header in enumerate(headers, 1):
-        cell = worksheet.cell(row=3, column=col, value=header)
-        cell.font = header_font
+    header_row = []
+    for header in headers:
+        cell = WriteOnlyCell(worksheet, value=header)
+        cell.font = PICKLIST_HEADER_FONT
         # Center specific headers
         if header in ["Qty", "Picked by", "Packed by"]:
-            cell.alignment = Alignment(horizontal='center')
-    
-    # Add border style
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    # Process hazmat items first - Group by SKU
-    row_idx = 4  # Start after headers
+            cell.alignment = PICKLIST_CENTER
+        header_row.append(cell)
+    worksheet.append(header_row)
     
-    # Group hazmat items by SKU with page number tracking
-    hazmat_items_by_sku = {}
+    # Process hazmat items first, starting after headers
+    row_idx = write_picklist_section(worksheet, warehouse_orders['hazmat'], 4)
     
-    if warehouse_orders['hazmat']:
-        for order in warehouse_orders['hazmat']:
-            for item in order['items']:
-                sku = item['sku']
-                if sku not in hazmat_items_by_sku:
-                    # Include variation in product name if present
-                    product_name = item['product_name']
-                    variation = item.get('variation', '')
-                    if variation:
-                        product_name = f"{variation} {product_name}"
-                        
-                    hazmat_items_by_sku[sku] = {
-                        'product_name': product_name,
-                        'quantity': 0,
-                        'pages': []
-                    }
-                # Add to total quantity
-                hazmat_items_by_sku[sku]['quantity'] += item['qty']
-                # Add page number to list
-                if 'page_number' in order:
-                    hazmat_items_by_sku[sku]['pages'].append(order['page_number'])
-        
-        # Add grouped hazmat items to the worksheet
-        row_counter = 0  # For alternating row colors
-        for sku, data in hazmat_items_by_sku.items():
-            # Apply alternating row background
-            if row_counter % 2 == 1:  # Odd rows get shaded
-                for col in range(1, 7):  # Updated to include new columns
-                    worksheet.cell(row=row_idx, column=col).fill = light_fill
-            
-            # Sort page numbers and create ranges
-            pages = sorted(data['pages'])
-            page_ranges = []
-            
-            if pages:
-                start = pages[0]
-                prev = start
-                
-                for i in range(1, len(pages)):
-                    if pages[i] != prev + 1:
-                        if start == prev:
-                            page_ranges.append(str(start))
-                        else:
-                            page_ranges.append(f"{start}-{prev}")
-                        start = pages[i]
-                    prev = pages[i]
-                
-                # Add the last range
-                if start == prev:
-                    page_ranges.append(str(start))
-                else:
-                    page_ranges.append(f"{start}-{prev}")
-                
-                page_text = ", ".join(page_ranges)
-            else:
-                page_text = ""
-            
-            # Add row to worksheet - Name, Qty, SKU, Pages, Picked by, Packed by
-            name_cell = worksheet.cell(row=row_idx, column=1, value=data['product_name'])
-            name_cell.font = product_name_font
-            name_cell.border = thin_border
-            name_cell.alignment = Alignment(wrap_text=True, vertical='center')
-            
-            qty_cell = worksheet.cell(row=row_idx, column=2, value=data['quantity'])
-            qty_cell.font = qty_font
-            qty_cell.border = thin_border
-            qty_cell.alignment = Alignment(horizontal='center', vertical='center')
-            
-            sku_cell = worksheet.cell(row=row_idx, column=3, value=sku)
-            sku_cell.font = content_font
-            sku_cell.border = thin_border
-            sku_cell.alignment = Alignment(vertical='center')
-            
-            page_cell = worksheet.cell(row=row_idx, column=4, value=page_text)
-            page_cell.font = content_font
-            page_cell.border = thin_border
-            page_cell.alignment = Alignment(vertical='center')
-            
-            # New columns for employee tracking
-            picked_cell = worksheet.cell(row=row_idx, column=5, value="")
-            picked_cell.font = content_font
-            picked_cell.border = thin_border
-            picked_cell.alignment = Alignment(horizontal='center', vertical='center')
-            
-            packed_cell = worksheet.cell(row=row_idx, column=6, value="")
-            packed_cell.font = content_font
-            packed_cell.border = thin_border
-            packed_cell.alignment = Alignment(horizontal='center', vertical='center')
-            
-            row_idx += 1
-            row_counter += 1
-    
-    # Add GROUND PICK LIST header
-    row_idx += 1  # Add a blank row
-    worksheet.merge_cells(f'A{row_idx}:F{row_idx}')
-    worksheet[f'A{row_idx}'] = "GROUND PICK LIST"
-    worksheet[f'A{row_idx}'].font = title_font
-    worksheet[f'A{row_idx}'].alignment = Alignment(horizontal='center')
+    # Add GROUND PICK LIST header after a blank row
+    worksheet.row_dimensions[row_idx].height = 35
+    worksheet.append([])
+    row_idx += 1
+    worksheet.row_dimensions[row_idx].height = 35
+    append_picklist_title(worksheet, row_idx, "GROUND PICK LIST")
     row_idx += 1
     
-    # Group ground items by SKU with page number tracking
-    ground_items_by_sku = {}
-    
-    if warehouse_orders['ground']:
-        for order in warehouse_orders['ground']:
-            for item in order['items']:
-                sku = item['sku']
-                if sku not in ground_items_by_sku:
-                    # Include variation in product name if present
-                    product_name = item['product_name']
-                    variation = item.get('variation', '')
-                    if variation:
-                        product_name = f"{variation} {product_name}"
-                        
-                    ground_items_by_sku[sku] = {
-                        'product_name': product_name,
-                        'quantity': 0,
-                        'pages': []
-                    }
-                # Add to total quantity
-                ground_items_by_sku[sku]['quantity'] += item['qty']
-                # Add page number to list
-                if 'page_number' in order:
-                    ground_items_by_sku[sku]['pages'].append(order['page_number'])
-        
-        # Add grouped ground items to the worksheet
-        row_counter = 0  # Reset counter for ground section
-        for sku, data in ground_items_by_sku.items():
-            # Apply alternating row background
-            if row_counter % 2 == 1:  # Odd rows get shaded
-                for col in range(1, 7):  # Updated to include new columns
-                    worksheet.cell(row=row_idx, column=col).fill = light_fill
-            
-            # Sort page numbers and create ranges
-            pages = sorted(data['pages'])
-            page_ranges = []
-            
-            if pages:
-                start = pages[0]
-                prev = start
-                
-                for i in range(1, len(pages)):
-                    if pages[i] != prev + 1:
-                        if start == prev:
-                            page_ranges.append(str(start))
-                        else:
-                            page_ranges.append(f"{start}-{prev}")
-                        start = pages[i]
-                    prev = pages[i]
-                
-                # Add the last range
-                if start == prev:
-                    page_ranges.append(str(start))
-                else:
-                    page_ranges.append(f"{start}-{prev}")
-                
-                page_text = ", ".join(page_ranges)
-            else:
-                page_text = ""
-            
-            # Add row to worksheet - Name, Qty, SKU, Pages, Picked by, Packed by
-            name_cell = worksheet.cell(row=row_idx, column=1, value=data['product_name'])
-            name_cell.font = product_name_font
-            name_cell.border = thin_border
-            name_cell.alignment = Alignment(wrap_text=True, vertical='center')
-            
-            qty_cell = worksheet.cell(row=row_idx, column=2, value=data['quantity'])
-            qty_cell.font = qty_font
-            qty_cell.border = thin_border
-            qty_cell.alignment = Alignment(horizontal='center', vertical='center')
-            
-            sku_cell = worksheet.cell(row=row_idx, column=3, value=sku)
-            sku_cell.font = content_font
-            sku_cell.border = thin_border
-            sku_cell.alignment = Alignment(vertical='center')
-            
-            page_cell = worksheet.cell(row=row_idx, column=4, value=page_text)
-            page_cell.font = content_font
-            page_cell.border = thin_border
-            page_cell.alignment = Alignment(vertical='center')
-            
-            # New columns for employee tracking
-            picked_cell = worksheet.cell(row=row_idx, column=5, value="")
-            picked_cell.font = content_font
-            picked_cell.border = thin_border
-            picked_cell.alignment = Alignment(horizontal='center', vertical='center')
-            
-            packed_cell = worksheet.cell(row=row_idx, column=6, value="")
-            packed_cell.font = content_font
-            packed_cell.border = thin_border
-            packed_cell.alignment = Alignment(horizontal='center', vertical='center')
-            
-            row_idx += 1
-            row_counter += 1
-    
-    # Set row heights to accommodate wrapped text
-    for row in range(4, row_idx):
-        worksheet.row_dimensions[row].height = 35  # Slightly increased for new columns
+    write_picklist_section(worksheet, warehouse_orders['ground'], row_idx)
     
     # Save the workbook
     workbook.save(output_path)
 
+def csv_field(value):
+    """
+    Quote a CSV field the way csv.writer's excel dialect would
+    """
+    if CSV_QUOTE_PATTERN.search(value):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+def csv_row(sku, product_name, variation, quantity):
+    """
+    Format one SKU count line of the pick list CSV
+    """
+    return f"{csv_field(sku)},{csv_field(product_name)},{csv_field(variation)},{quantity}{CSV_LINE_END}"
+
+def section_rows(counts, best_product_names, best_variations):
+    """
+    Flatten one CSV section into (sku, product name, variation, quantity,
+    -quantity) rows, sorted by quantity descending and then by SKU
+    """
+    rows = [(sku, best_product_names[sku], best_variations[sku], quantity, -quantity)
+            for sku, quantity in counts.items()]
+    rows.sort(key=itemgetter(4, 0))
+    return rows
+
 def save_sku_counts_to_csv(packingroom_orders, csv_output_path):
     """
     Save SKU counts to a CSV file with sections matching the new packingroom order categories:
@@ -762,162 +849,75 @@ def save_sku_counts_to_csv(packingroom_orders, csv_output_path):
     5. GROUND - SINGLE SKU ORDERS (MULTI QTY)
     6. GROUND - MULTI SKU ORDERS
     """
-    # Create dictionaries for each section
-    hazmat_single_item_counts = defaultdict(lambda: {"product_name": "", "variation": "", "quantity": 0})
-    hazmat_single_sku_counts = defaultdict(lambda: {"product_name": "", "variation": "", "quantity": 0})
-    hazmat_multi_sku_counts = defaultdict(lambda: {"product_name": "", "variation": "", "quantity": 0})
-    
-    ground_single_item_counts = defaultdict(lambda: {"product_name": "", "variation": "", "quantity": 0})
-    ground_single_sku_counts = defaultdict(lambda: {"product_name": "", "variation": "", "quantity": 0})
-    ground_multi_sku_counts = defaultdict(lambda: {"product_name": "", "variation": "", "quantity": 0})
-
-    # First pass: collect all product names and variations for each SKU (we'll choose the most complete ones)
-    all_product_names = defaultdict(list)
-    all_variations = defaultdict(list)
-    
-    # Use the dictionary structure from the new sorting
-    for order in packingroom_orders['all']:
-        for item in order['items']:
-            all_product_names[item['sku']].append(item['product_name'])
-            if 'variation' in item:
-                all_variations[item['sku']].append(item['variation'])
+    # Create a dictionary for each section, mapping SKU to total quantity,
+    # keyed by the packing room category it is counted from
+    section_counts = {
+        (category, subcategory): {}
+        for _, category in CSV_PICK_LISTS
+        for _, subcategory in CSV_SECTIONS
+    }
     
-    # Select the most informative product name for each SKU (usually the longest)
+    # Keep a running best name and variation per SKU while counting, rather
+    # than collecting every occurrence and reducing the lists afterwards
     best_product_names = {}
     best_variations = {}
     
-    for sku, names in all_product_names.items():
-        if names:
-            # Filter out empty names
-            valid_names = [name for name in names if name.strip()]
-            if valid_names:
+    # Count total quantities for each SKU by category in one walk over the
+    # categorized orders (together they make up packingroom_orders['all'])
+    for (category, subcategory), counts in section_counts.items():
+        for order in packingroom_orders[category][subcategory]:
+            for item in order['items']:
+                sku = item['sku']
+                counts[sku] = counts.get(sku, 0) + item['qty']
+                
                 # Choose the longest name as it's likely the most complete
-                best_product_names[sku] = max(valid_names, key=len)
-            else:
-                best_product_names[sku] = ""
-    
-    for sku, variations in all_variations.items():
-        if variations:
-            # Filter out empty variations
-            valid_variations = [var for var in variations if var.strip()]
-            if valid_variations:
+                product_name = item['product_name']
+                best_name = best_product_names.get(sku)
+                if best_name is None or len(product_name) > len(best_name):
+                    best_product_names[sku] = product_name
+                
                 # Choose the first non-empty variation (they should be consistent for a SKU)
-                best_variations[sku] = valid_variations[0]
-            else:
-                best_variations[sku] = ""
-        else:
-            best_variations[sku] = ""
-    
-    # Second pass: categorize and count total quantities for each SKU by category
-    # Hazmat - Single Item
-    for order in packingroom_orders['hazmat']['single_item']:
-        for item in order['items']:
-            hazmat_single_item_counts[item['sku']]["product_name"] = best_product_names.get(item['sku'], "")
-            hazmat_single_item_counts[item['sku']]["variation"] = best_variations.get(item['sku'], "")
-            hazmat_single_item_counts[item['sku']]["quantity"] += item['qty']
-    
-    # Hazmat - Single SKU, Multiple Qty
-    for order in packingroom_orders['hazmat']['single_sku']:
-        for item in order['items']:
-            hazmat_single_sku_counts[item['sku']]["product_name"] = best_product_names.get(item['sku'], "")
-            hazmat_single_sku_counts[item['sku']]["variation"] = best_variations.get(item['sku'], "")
-            hazmat_single_sku_counts[item['sku']]["quantity"] += item['qty']
+                if not best_variations.get(sku):
+                    best_variations[sku] = item.get('variation', "")
     
-    # Hazmat - Multi SKU
-    for order in packingroom_orders['hazmat']['multi_sku']:
-        for item in order['items']:
-            hazmat_multi_sku_counts[item['sku']]["product_name"] = best_product_names.get(item['sku'], "")
-            hazmat_multi_sku_counts[item['sku']]["variation"] = best_variations.get(item['sku'], "")
-            hazmat_multi_sku_counts[item['sku']]["quantity"] += item['qty']
+    # Build the whole CSV as pre-formatted lines and write it out in one go
+    lines = []
+    for pick_list_title, category in CSV_PICK_LISTS:
+        lines.append(pick_list_title + CSV_LINE_END)
+        
+        for section_title, subcategory in CSV_SECTIONS:
+            lines.append(section_title + CSV_LINE_END)
+            lines.append(CSV_COLUMN_HEADER)
+            
+            rows = section_rows(section_counts[(category, subcategory)],
+                                best_product_names, best_variations)
+            lines.extend(csv_row(sku, product_name, variation, quantity)
+                         for sku, product_name, variation, quantity, _ in rows)
+            
+            # Blank line between sections
+            lines.append(CSV_LINE_END)
     
-    # Ground - Single Item
-    for order in packingroom_orders['ground']['single_item']:
-        for item in order['items']:
-            ground_single_item_counts[item['sku']]["product_name"] = best_product_names.get(item['sku'], "")
-            ground_single_item_counts[item['sku']]["variation"] = best_variations.get(item['sku'], "")
-            ground_single_item_counts[item['sku']]["quantity"] += item['qty']
+    # No blank line after the last section
+    lines.pop()
     
-    # Ground - Single SKU, Multiple Qty
-    for order in packingroom_orders['ground']['single_sku']:
-        for item in order['items']:
-            ground_single_sku_counts[item['sku']]["product_name"] = best_product_names.get(item['sku'], "")
-            ground_single_sku_counts[item['sku']]["variation"] = best_variations.get(item['sku'], "")
-            ground_single_sku_counts[item['sku']]["quantity"] += item['qty']
-    
-    # Ground - Multi SKU
-    for order in packingroom_orders['ground']['multi_sku']:
-        for item in order['items']:
-            ground_multi_sku_counts[item['sku']]["product_name"] = best_product_names.get(item['sku'], "")
-            ground_multi_sku_counts[item['sku']]["variation"] = best_variations.get(item['sku'], "")
-            ground_multi_sku_counts[item['sku']]["quantity"] += item['qty']
-            
-    # Create a single CSV file with all sections
     with open(csv_output_path, mode='w', newline='') as file:
-        writer = csv.writer(file)
-        
-        # HAZMAT sections
-        writer.writerow(["HAZMAT PICK LIST"])
-        
-        # HAZMAT - Single Item Orders
-        writer.writerow(["SINGLE ITEM ORDERS"])
-        writer.writerow(["SKU", "Product Name", "Variation", "Quantity"])
-        
-        sorted_hazmat_single_item = sorted(hazmat_single_item_counts.items(), key=lambda x: (-x[1]["quantity"], x[0]))
-        for sku, data in sorted_hazmat_single_item:
-            writer.writerow([sku, data["product_name"], data["variation"], data["quantity"]])
-        
-        writer.writerow([])
-        
-        # HAZMAT - Single SKU Orders (Multi Qty)
-        writer.writerow(["SINGLE SKU ORDERS (MULTI QTY)"])
-        writer.writerow(["SKU", "Product Name", "Variation", "Quantity"])
-        
-        sorted_hazmat_single_sku = sorted(hazmat_single_sku_counts.items(), key=lambda x: (-x[1]["quantity"], x[0]))
-        for sku, data in sorted_hazmat_single_sku:
-            writer.writerow([sku, data["product_name"], data["variation"], data["quantity"]])
-        
-        writer.writerow([])
-        
-        # HAZMAT - Multi SKU Orders
-        writer.writerow(["MULTI SKU ORDERS"])
-        writer.writerow(["SKU", "Product Name", "Variation", "Quantity"])
-        
-        sorted_hazmat_multi_sku = sorted(hazmat_multi_sku_counts.items(), key=lambda x: (-x[1]["quantity"], x[0]))
-        for sku, data in sorted_hazmat_multi_sku:
-            writer.writerow([sku, data["product_name"], data["variation"], data["quantity"]])
-        
-        writer.writerow([])
-        
-        # GROUND sections
-        writer.writerow(["GROUND PICK LIST"])
-        
-        # GROUND - Single Item Orders
-        writer.writerow(["SINGLE ITEM ORDERS"])
-        writer.writerow(["SKU", "Product Name", "Variation", "Quantity"])
-        
-        sorted_ground_single_item = sorted(ground_single_item_counts.items(), key=lambda x: (-x[1]["quantity"], x[0]))
-        for sku, data in sorted_ground_single_item:
-            writer.writerow([sku, data["product_name"], data["variation"], data["quantity"]])
-        
-        writer.writerow([])
-        
-        # GROUND - Single SKU Orders (Multi Qty)
-        writer.writerow(["SINGLE SKU ORDERS (MULTI QTY)"])
-        writer.writerow(["SKU", "Product Name", "Variation", "Quantity"])
-        
-        sorted_ground_single_sku = sorted(ground_single_sku_counts.items(), key=lambda x: (-x[1]["quantity"], x[0]))
-        for sku, data in sorted_ground_single_sku:
-            writer.writerow([sku, data["product_name"], data["variation"], data["quantity"]])
-        
-        writer.writerow([])
-        
-        # GROUND - Multi SKU Orders
-        writer.writerow(["MULTI SKU ORDERS"])
-        writer.writerow(["SKU", "Product Name", "Variation", "Quantity"])
-        
-        sorted_ground_multi_sku = sorted(ground_multi_sku_counts.items(), key=lambda x: (-x[1]["quantity"], x[0]))
-        for sku, data in sorted_ground_multi_sku:
-            writer.writerow([sku, data["product_name"], data["variation"], data["quantity"]])
+        file.write("".join(lines))
+
+def insert_order_pages(output_pdf, order):
+    """
+    Copy an order's label and packing slips into output_pdf, inserting each
+    run of consecutive source pages with a single insert_pdf call
+    """
+    label_index, slip_indices = order['page_numbers']
+    page_indices = [label_index, *slip_indices]
+    
+    run_start = previous = page_indices[0]
+    for page_index in page_indices[1:]:
+        if page_index != previous + 1:
+            output_pdf.insert_pdf(order['source_pdf'], from_page=run_start, to_page=previous)
+            run_start = page_index
+        previous = page_index
+    output_pdf.insert_pdf(order['source_pdf'], from_page=run_start, to_page=previous)
 
 def move_to_discard_folder(original_file):
     """
@@ -928,6 +928,89 @@ def move_to_discard_folder(original_file):
     discard_path = os.path.join(discard_dir, os.path.basename(original_file))
     os.rename(original_file, discard_path)
 
+def extract_pdf_orders(pdf_document, hazmat_pattern, parallel=True, status_callback=None):
+    """
+    Read the orders out of one PDF without modifying it.
+    Uses multi-slip grouping when the PDF has labels followed by packing
+    slips, otherwise pairs every 2 pages (label, packing slip).
+    Returns a dict with 'total_pages', 'multi_slip' and 'orders', where each
+    order holds page indices, per-slip items and the parsed order details
+    """
+    total_pages = len(pdf_document)
+    
+    # Extract and classify every page once; the texts are reused below
+    page_types, page_texts = classify_pages(pdf_document, parallel, status_callback)
+    
+    # Try to detect if this PDF has multi-slip orders
+    label_groups = group_label_with_packing_slips(pdf_document, page_types)
+    
+    orders = []
+    if label_groups:
+        for group in label_groups:
+            # The tracking number lives on the label, so parse it once per group
+            tracking_number = extract_tracking_number(page_texts[group['label_index']])
+            
+            # Extract information from all packing slips
+            slip_items = []
+            qty_total = 0
+            order_id = None
+            is_hazmat = False
+            
+            # Process each packing slip in the group
+            for slip_index in group['packing_slip_indices']:
+                page_text = page_texts[slip_index]
+                
+                # Extract order ID from the first packing slip that has one
+                if order_id is None:
+                    order_id = extract_order_id(page_text)
+                
+                # Extract items from this packing slip
+                slip_items.append(extract_items(page_text))
+                
+                # Extract qty total using compiled regex
+                qty_total_match = QTY_TOTAL_PATTERN.search(page_text)
+                if qty_total_match:
+                    qty_total += int(qty_total_match.group(1))
+                
+                # Check for hazmat keywords, until one slip has matched
+                if not is_hazmat and contains_hazmat_keyword(page_text, hazmat_pattern):
+                    is_hazmat = True
+            
+            orders.append({
+                'label_index': group['label_index'],
+                'packing_slip_indices': group['packing_slip_indices'],
+                'slip_items': slip_items,
+                'qty_total': qty_total,
+                'order_id': order_id,
+                'tracking_number': tracking_number,
+                'is_hazmat': is_hazmat
+            })
+    else:
+        # Fall back to traditional processing (every 2 pages)
+        for i in range(0, total_pages - 1, 2):
+            label_text = page_texts[i]
+            page_text = page_texts[i + 1]
+            
+            qty_total_match = QTY_TOTAL_PATTERN.search(page_text)
+            orders.append({
+                'label_index': i,
+                'packing_slip_indices': [i + 1],
+                'slip_items': [extract_items(page_text)],
+                'qty_total': int(qty_total_match.group(1)) if qty_total_match else 0,
+                'order_id': extract_order_id(page_text),
+                'tracking_number': extract_tracking_number(label_text),
+                'is_hazmat': contains_hazmat_keyword(page_text, hazmat_pattern)
+            })
+    
+    return {'total_pages': total_pages, 'multi_slip': bool(label_groups), 'orders': orders}
+
+def extract_pdf_orders_from_path(pdf_path, hazmat_pattern):
+    """
+    Run extract_pdf_orders in a worker process, on its own copy of the PDF
+    """
+    with fitz.open(pdf_path) as pdf_document:
+        return extract_pdf_orders(pdf_document, hazmat_pattern, parallel=False)
+
 def process_pdfs(input_folder, output_folder, hazmat_keywords, auto_open=False, status_callback=None, hazmat_sticker_enabled=True):
     """
     Process PDFs with support for multiple packing slips per label.
@@ -948,7 +1031,11 @@ def process_pdfs(input_folder, output_folder, hazmat_keywords, auto_open=False,
     if status_callback:
         status_callback(f"Looking for PDF files in {input_folder}")
     
-    pdf_files = [f for f in os.listdir(input_folder) if f.lower().endswith(".pdf")]
+    # scandir's entries know their type, so folders named *.pdf are skipped
+    # without an extra stat per file
+    with os.scandir(input_folder) as entries:
+        pdf_files = [entry.name for entry in entries
+                     if entry.name.lower().endswith(".pdf") and entry.is_file()]
     if not pdf_files:
         if status_callback:
             status_callback("No PDF files found in the input folder.")
@@ -960,7 +1047,6 @@ def process_pdfs(input_folder, output_folder, hazmat_keywords, auto_open=False,
     os.makedirs(output_dir, exist_ok=True)
     
     # Get hazmat image path
-    import sys
     if getattr(sys, 'frozen', False):
         # Running as compiled application
         application_path = sys._MEIPASS
@@ -974,9 +1060,14 @@ def process_pdfs(input_folder, output_folder, hazmat_keywords, auto_open=False,
         if status_callback:
             status_callback(f"Warning: Hazmat image not found at {hazmat_image_path}")
     
+    # Match all hazmat keywords with one precompiled pattern
+    # Sorted so the same keywords in any order share one cached pattern
+    hazmat_pattern = compile_hazmat_pattern(tuple(sorted(hazmat_keywords)))
+    
     # Collect all orders from all PDFs
     all_orders = []
     processed_files = []
+    open_pdfs = {}  # Source documents by path, closed once at the end
     all_tracking_numbers = set()
     duplicate_tracking_numbers = set()
     duplicate_details = []
@@ -987,370 +1078,350 @@ def process_pdfs(input_folder, output_folder, hazmat_keywords, auto_open=False,
     if status_callback:
         status_callback(f"Found {len(pdf_files)} PDF files to process.")
     
-    for pdf_file in pdf_files:
-        input_pdf_path = os.path.join(input_folder, pdf_file)
-        if status_callback:
-            status_callback(f"Processing: {pdf_file}")
-        
-        # Open the PDF
-        pdf_document = fitz.open(input_pdf_path)
-        total_pages = len(pdf_document)
-        if status_callback:
-            status_callback(f"  - {total_pages} pages found in {pdf_file}")
-        
-        # Try to detect if this PDF has multi-slip orders
-        label_groups = group_label_with_packing_slips(pdf_document)
-        
-        if label_groups:
-            # Process using multi-slip logic
-            if status_callback:
-                status_callback(f"  - Using multi-slip processing for {pdf_file}")
+    try:
+        # Each PDF is parsed independently, so with several files and cores they
+        # are read in parallel worker processes; the pages are then annotated and
+        # collected here in file order, keeping tracking-number checks and
+        # messages sequential. Each file is picked up as soon as its worker is
+        # done, so annotating one file overlaps with parsing the next ones
+        pdf_paths = [os.path.join(input_folder, pdf_file) for pdf_file in pdf_files]
+        workers = pool_workers(len(pdf_paths))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=POOL_CONTEXT) if workers > 1 else nullcontext() as executor:
+            extraction_futures = None
+            if executor is not None:
+                try:
+                    extraction_futures = [executor.submit(extract_pdf_orders_from_path, pdf_path, hazmat_pattern)
+                                          for pdf_path in pdf_paths]
+                except Exception as e:
+                    extraction_futures = None  # Fall back to reading them in this process
+                    if status_callback:
+                        status_callback(f"  - Warning: parallel reading failed, reading files directly: {e}")
             
-            for group in label_groups:
-                label_page = group['label_page']
-                packing_slips = group['packing_slips']
-                
-                # Track multi-slip statistics
-                if len(packing_slips) > 1:
-                    multi_slip_orders += 1
-                    max_slips_per_order = max(max_slips_per_order, len(packing_slips))
-                
-                # Extract information from all packing slips
-                all_items = []
-                qty_total = 0
-                order_id = None
-                tracking_number = None
-                is_hazmat = False
+            for file_index, (pdf_file, input_pdf_path) in enumerate(zip(pdf_files, pdf_paths)):
+                if status_callback:
+                    status_callback(f"Processing: {pdf_file}")
+            
+                # Open the PDF
+                pdf_document = fitz.open(input_pdf_path)
+                open_pdfs[input_pdf_path] = pdf_document
+            
+                extracted = None
+                if extraction_futures is not None:
+                    try:
+                        extracted = extraction_futures[file_index].result()
+                    except Exception as e:
+                        extracted = None  # Read this one in this process instead
+                        if status_callback:
+                            status_callback(f"  - Warning: parallel reading of {pdf_file} failed, reading it directly: {e}")
+                if extracted is None:
+                    extracted = extract_pdf_orders(pdf_document, hazmat_pattern, status_callback=status_callback)
+            
+                total_pages = extracted['total_pages']
+                if status_callback:
+                    status_callback(f"  - {total_pages} pages found in {pdf_file}")
+            
+                if extracted['multi_slip']:
+                    # Process using multi-slip logic
+                    if status_callback:
+                        status_callback(f"  - Using multi-slip processing for {pdf_file}")
                 
-                # Process each packing slip in the group
-                for i, packing_slip_page in enumerate(packing_slips):
-                    page_text = packing_slip_page.get_text()
+                    for extracted_order in extracted['orders']:
+                        label_page = pdf_document[extracted_order['label_index']]
+                        packing_slip_indices = extracted_order['packing_slip_indices']
+                        packing_slips = [pdf_document[slip_index] for slip_index in packing_slip_indices]
+                        tracking_number = extracted_order['tracking_number']
+                        order_id = extracted_order['order_id']
+                        is_hazmat = extracted_order['is_hazmat']
                     
-                    # Extract order ID and tracking number from first packing slip
-                    if order_id is None:
-                        order_id = extract_order_id(page_text)
-                    if tracking_number is None:
-                        tracking_number = extract_tracking_number(label_page.get_text())
+                        # Track multi-slip statistics
+                        if len(packing_slips) > 1:
+                            multi_slip_orders += 1
+                            max_slips_per_order = max(max_slips_per_order, len(packing_slips))
                     
-                    # Extract items from this packing slip
-                    items = extract_items(page_text)
-                    all_items.extend(items)
+                        # Add multi-quantity header to each packing slip if needed
+                        all_items = []
+                        for packing_slip_page, items in zip(packing_slips, extracted_order['slip_items']):
+                            all_items.extend(items)
+                            add_multi_qty_header(packing_slip_page, items)
                     
-                    # Extract qty total using compiled regex
-                    qty_total_match = QTY_TOTAL_PATTERN.search(page_text)
-                    if qty_total_match:
-                        qty_total += int(qty_total_match.group(1))
+                        # Check for duplicate tracking numbers
+                        if tracking_number:
+                            if tracking_number in all_tracking_numbers:
+                                duplicate_tracking_numbers.add(tracking_number)
+                                duplicate_details.append(f"Tracking: {tracking_number}, Order: {order_id}")
+                                if status_callback:
+                                    status_callback(f"  - Found duplicate tracking number: {tracking_number}")
+                            all_tracking_numbers.add(tracking_number)
+                            total_orders += 1
                     
-                    # Check for hazmat keywords
-                    if any(keyword.lower() in page_text.lower() for keyword in hazmat_keywords):
-                        is_hazmat = True
+                        # Add hazmat image to label if needed and if stickers are enabled
+                        if is_hazmat and hazmat_sticker_enabled:
+                            if status_callback:
+                                status_callback(f"  - Hazmat keyword found, adding sticker to label")
+                            add_hazmat_image_to_page(label_page, hazmat_image_path)
+                        elif is_hazmat and not hazmat_sticker_enabled:
+                            if status_callback:
+                                status_callback(f"  - Hazmat keyword found, but stickers disabled")
                     
-                    # Add multi-quantity header if needed
-                    add_multi_qty_header(packing_slip_page, items)
-                
-                # Check for duplicate tracking numbers
-                if tracking_number:
-                    if tracking_number in all_tracking_numbers:
-                        duplicate_tracking_numbers.add(tracking_number)
-                        duplicate_details.append(f"Tracking: {tracking_number}, Order: {order_id}")
-                        if status_callback:
-                            status_callback(f"  - Found duplicate tracking number: {tracking_number}")
-                    all_tracking_numbers.add(tracking_number)
-                    total_orders += 1
-                
-                # Add hazmat image to label if needed and if stickers are enabled
-                if is_hazmat and hazmat_sticker_enabled:
-                    if status_callback:
-                        status_callback(f"  - Hazmat keyword found, adding sticker to label")
-                    add_hazmat_image_to_page(label_page, hazmat_image_path)
-                elif is_hazmat and not hazmat_sticker_enabled:
+                        # Add to all orders
+                        order_info = {
+                            'items': all_items,
+                            'qty_total': extracted_order['qty_total'],
+                            'pages': (label_page, packing_slips),
+                            'source_pdf': pdf_document,
+                            'page_numbers': (extracted_order['label_index'], packing_slip_indices),
+                            'is_hazmat': is_hazmat,
+                            'order_id': order_id,
+                            'tracking_number': tracking_number,
+                            'num_packing_slips': len(packing_slips),
+                            'single_sku': all_items[0]['sku'] if len(all_items) == 1 else None
+                        }
+                    
+                        all_orders.append(order_info)
+                else:
+                    # Fall back to traditional processing (every 2 pages)
                     if status_callback:
-                        status_callback(f"  - Hazmat keyword found, but stickers disabled")
-                
-                # Add to all orders
-                order_info = {
-                    'items': all_items,
-                    'qty_total': qty_total,
-                    'pages': (label_page, packing_slips),
-                    'source_pdf': pdf_document,
-                    'page_numbers': (group['label_index'], group['packing_slip_indices']),
-                    'is_hazmat': is_hazmat,
-                    'order_id': order_id,
-                    'tracking_number': tracking_number,
-                    'num_packing_slips': len(packing_slips)
-                }
-                
-                all_orders.append(order_info)
-        else:
-            # Fall back to traditional processing (every 2 pages)
-            if status_callback:
-                status_callback(f"  - Using traditional 2-page processing for {pdf_file}")
+                        status_callback(f"  - Using traditional 2-page processing for {pdf_file}")
                 
-            for i in range(0, total_pages, 2):
-                label_page = pdf_document[i]
-                if i + 1 < total_pages:
-                    packing_slip_page = pdf_document[i + 1]
-                    page_text = packing_slip_page.get_text()
+                    for extracted_order in extracted['orders']:
+                        i = extracted_order['label_index']
+                        label_page = pdf_document[i]
+                        packing_slip_page = pdf_document[i + 1]
+                        tracking_number = extracted_order['tracking_number']
+                        order_id = extracted_order['order_id']
+                        is_hazmat = extracted_order['is_hazmat']
+                        items = extracted_order['slip_items'][0]
                     
-                    # Extract order ID for reference
-                    order_id = extract_order_id(page_text)
+                        # Check for duplicate tracking numbers
+                        if tracking_number:
+                            # Check if it's a duplicate
+                            if tracking_number in all_tracking_numbers:
+                                duplicate_tracking_numbers.add(tracking_number)
+                                duplicate_details.append(f"Tracking: {tracking_number}, Order: {order_id}")
+                                if status_callback:
+                                    status_callback(f"Found duplicate tracking number: {tracking_number} (Order ID: {order_id})")
+                            all_tracking_numbers.add(tracking_number)
+                            total_orders += 1  # Count each tracking number as an order
                     
-                    # Extract tracking number and check for duplicates
-                    tracking_number = extract_tracking_number(label_page.get_text())
+                        # Add multi-quantity header if needed
+                        add_multi_qty_header(packing_slip_page, items)
                     
-                    if tracking_number:
-                        # Check if it's a duplicate
-                        if tracking_number in all_tracking_numbers:
-                            duplicate_tracking_numbers.add(tracking_number)
-                            duplicate_details.append(f"Tracking: {tracking_number}, Order: {order_id}")
+                        if is_hazmat and hazmat_sticker_enabled:
                             if status_callback:
-                                status_callback(f"Found duplicate tracking number: {tracking_number} (Order ID: {order_id})")
-                        all_tracking_numbers.add(tracking_number)
-                        total_orders += 1  # Count each tracking number as an order
-                    
-                    items = extract_items(page_text)
-                    qty_total_match = QTY_TOTAL_PATTERN.search(page_text)
-                    qty_total = int(qty_total_match.group(1)) if qty_total_match else 0
+                                status_callback(f"  - Hazmat keyword found on page {i + 2}, adding sticker to label.")
+                            add_hazmat_image_to_page(label_page, hazmat_image_path)
+                        elif is_hazmat and not hazmat_sticker_enabled:
+                            if status_callback:
+                                status_callback(f"  - Hazmat keyword found on page {i + 2}, but stickers disabled.")
                     
-                    # Add multi-quantity header if needed
-                    add_multi_qty_header(packing_slip_page, items)
+                        # Add to all orders with reference to original PDF and pages
+                        order_info = {
+                            'items': items,
+                            'qty_total': extracted_order['qty_total'],
+                            'pages': (label_page, [packing_slip_page]),  # Wrap in list for consistency
+                            'source_pdf': pdf_document,
+                            'page_numbers': (i, [i + 1]),  # Wrap in list for consistency
+                            'is_hazmat': is_hazmat,
+                            'order_id': order_id,
+                            'tracking_number': tracking_number,
+                            'num_packing_slips': 1,
+                            'single_sku': items[0]['sku'] if len(items) == 1 else None
+                        }
                     
-                    # Check for hazmat keywords
-                    is_hazmat = any(keyword.lower() in page_text.lower() for keyword in hazmat_keywords)
+                        all_orders.append(order_info)
+            
+                processed_files.append(input_pdf_path)
+        
+        # Sort all orders according to the new rules
+        if status_callback:
+            status_callback(f"Sorting {len(all_orders)} orders...")
+        
+        sorted_orders = sort_orders(all_orders)
+        
+        # Output file paths
+        output_files = []
+        
+        # Process high-quantity SKUs - REMOVED tkinter messagebox for web compatibility
+        high_qty_skus = sorted_orders['high_qty_skus']
+        separated_skus = {'hazmat': set(), 'ground': set()}
+        for sku, info in high_qty_skus.items():
+            if info['count'] >= 100:
+                if status_callback:
+                    status_callback(f"Found high-quantity SKU: {sku} - {info['product_name']} ({info['count']} orders)")
+                
+                # In web version, automatically create separate file (no user prompt)
+                if status_callback:
+                    status_callback(f"Creating separate file for high-quantity SKU: {sku}")
+                
+                # Create separate PDF for this SKU
+                sku_pdf_path = os.path.join(output_dir, f"sku_{sku}_{info['count']}.pdf")
+                output_files.append(sku_pdf_path)
+                
+                sku_pdf = fitz.open()
+                
+                # Add page numbers and label counts to orders
+                page_number = 1
+                order_count = 1
+                total_count = len(info['orders'])
+                
+                # Add all orders for this SKU to the PDF
+                for order in info['orders']:
+                    # Add page number to the order for referencing in the picklist
+                    order['page_number'] = page_number
                     
-                    if is_hazmat and hazmat_sticker_enabled:
-                        if status_callback:
-                            status_callback(f"  - Hazmat keyword found on page {i + 2}, adding sticker to label.")
-                        add_hazmat_image_to_page(label_page, hazmat_image_path)
-                    elif is_hazmat and not hazmat_sticker_enabled:
-                        if status_callback:
-                            status_callback(f"  - Hazmat keyword found on page {i + 2}, but stickers disabled.")
+                    # Number the packing slips on the source pages before copying them
+                    for j, slip_index in enumerate(order['page_numbers'][1]):
+                        slip_page = order['source_pdf'][slip_index]
+                        slip_size = page_dimensions(slip_page)
+                        # Add page number with slip count if multiple slips
+                        if len(order['page_numbers'][1]) > 1:
+                            add_page_number_with_slip_count(slip_page, page_number, j + 1, len(order['page_numbers'][1]), slip_size)
+                        else:
+                            add_page_number(slip_page, page_number, slip_size)
+                        
+                        # Add SKU count on the first packing slip
+                        if j == 0:
+                            add_label_count(slip_page, sku, order_count, total_count, slip_size)
                     
-                    # Add to all orders with reference to original PDF and pages
-                    order_info = {
-                        'items': items,
-                        'qty_total': qty_total,
-                        'pages': (label_page, [packing_slip_page]),  # Wrap in list for consistency
-                        'source_pdf': pdf_document,
-                        'page_numbers': (i, [i + 1]),  # Wrap in list for consistency
-                        'is_hazmat': is_hazmat,
-                        'order_id': order_id,
-                        'tracking_number': tracking_number,
-                        'num_packing_slips': 1
-                    }
+                    # Add the label and its slips, already annotated, to the PDF
+                    insert_order_pages(sku_pdf, order)
                     
-                    all_orders.append(order_info)
+                    # Increment counters
+                    page_number += 1
+                    order_count += 1
+                
+                sku_pdf.save(sku_pdf_path)
+                sku_pdf.close()
+                
+                if status_callback:
+                    status_callback(f"Created separate file for SKU {sku}: {sku_pdf_path}")
+                
+                # Remove these orders from warehouse processing (below, in one pass)
+                separated_skus['hazmat' if info['is_hazmat'] else 'ground'].add(sku)
         
-        processed_files.append(input_pdf_path)
-    
-    # Sort all orders according to the new rules
-    if status_callback:
-        status_callback(f"Sorting {len(all_orders)} orders...")
-    
-    sorted_orders = sort_orders(all_orders)
-    
-    # Output file paths
-    output_files = []
-    
-    # Process high-quantity SKUs - REMOVED tkinter messagebox for web compatibility
-    high_qty_skus = sorted_orders['high_qty_skus']
-    for sku, info in high_qty_skus.items():
-        if info['count'] >= 100:
-            if status_callback:
-                status_callback(f"Found high-quantity SKU: {sku} - {info['product_name']} ({info['count']} orders)")
-            
-            # In web version, automatically create separate file (no user prompt)
-            if status_callback:
-                status_callback(f"Creating separate file for high-quantity SKU: {sku}")
-            
-            # Create separate PDF for this SKU
-            sku_pdf_path = os.path.join(output_dir, f"sku_{sku}_{info['count']}.pdf")
-            output_files.append(sku_pdf_path)
-            
-            sku_pdf = fitz.open()
+        # Drop the separated SKUs' orders from the warehouse lists
+        if separated_skus['hazmat'] or separated_skus['ground']:
+            for category, skus in separated_skus.items():
+                if skus:
+                    sorted_orders['warehouse'][category] = [
+                        order for order in sorted_orders['warehouse'][category]
+                        if order['single_sku'] not in skus
+                    ]
             
-            # Add page numbers and label counts to orders
-            page_number = 1
-            order_count = 1
-            total_count = len(info['orders'])
+            # Update the all list
+            sorted_orders['warehouse']['all'] = sorted_orders['warehouse']['hazmat'] + sorted_orders['warehouse']['ground']
+        
+        # Process warehouse orders
+        warehouse_pdf_path = os.path.join(output_dir, "warehouse_labels.pdf")
+        output_files.append(warehouse_pdf_path)
+        
+        # Count SKUs for label counting (e.g., "1 of 5", "2 of 5")
+        sku_counts = defaultdict(int)
+        for order in sorted_orders['warehouse']['all']:
+            if order['single_sku'] is not None:
+                sku_counts[order['single_sku']] += 1
+        
+        # Add page numbers and label counts to warehouse orders
+        page_number = 1
+        sku_counters = defaultdict(int)
+        
+        # Create warehouse PDF with both hazmat and ground orders
+        if sorted_orders['warehouse']['all']:
+            warehouse_pdf = fitz.open()
             
-            # Add all orders for this SKU to the PDF
-            for order in info['orders']:
+            # Process all warehouse orders
+            for order in sorted_orders['warehouse']['all']:
                 # Add page number to the order for referencing in the picklist
                 order['page_number'] = page_number
                 
-                # Add pages to the PDF
-                sku_pdf.insert_pdf(order['source_pdf'], 
-                                  from_page=order['page_numbers'][0], 
-                                  to_page=order['page_numbers'][0])
-                
-                # Add all packing slips
+                # Number the packing slips on the source pages before copying them
                 for j, slip_index in enumerate(order['page_numbers'][1]):
                     slip_page = order['source_pdf'][slip_index]
+                    slip_size = page_dimensions(slip_page)
+                    
                     # Add page number with slip count if multiple slips
                     if len(order['page_numbers'][1]) > 1:
-                        add_page_number_with_slip_count(slip_page, page_number, j + 1, len(order['page_numbers'][1]))
+                        add_page_number_with_slip_count(slip_page, page_number, j + 1, len(order['page_numbers'][1]), slip_size)
                     else:
-                        add_page_number(slip_page, page_number)
-                    
-                    # Add SKU count on the first packing slip
-                    if j == 0:
-                        add_label_count(slip_page, sku, order_count, total_count)
+                        add_page_number(slip_page, page_number, slip_size)
                     
-                    sku_pdf.insert_pdf(order['source_pdf'], 
-                                      from_page=slip_index, 
-                                      to_page=slip_index)
+                    # Add SKU count for SKUs with qty >= 5 (on first slip only)
+                    if j == 0 and order['single_sku'] is not None:
+                        sku = order['single_sku']
+                        if sku_counts[sku] >= 5:
+                            sku_counters[sku] += 1
+                            current_count = sku_counters[sku]
+                            total_count = sku_counts[sku]
+                            add_label_count(slip_page, sku, current_count, total_count, slip_size)
                 
-                # Increment counters
+                # Add the label and its slips, already annotated, to the PDF
+                insert_order_pages(warehouse_pdf, order)
+                
+                # Increment page number for the next order
                 page_number += 1
-                order_count += 1
             
-            sku_pdf.save(sku_pdf_path)
-            sku_pdf.close()
+            warehouse_pdf.save(warehouse_pdf_path)
+            warehouse_pdf.close()
             
             if status_callback:
-                status_callback(f"Created separate file for SKU {sku}: {sku_pdf_path}")
+                status_callback(f"Warehouse labels saved to {warehouse_pdf_path}")
             
-            # Remove these orders from warehouse processing
-            if info['is_hazmat']:
-                sorted_orders['warehouse']['hazmat'] = [
-                    order for order in sorted_orders['warehouse']['hazmat']
-                    if len(order['items']) != 1 or order['items'][0]['sku'] != sku
-                ]
-            else:
-                sorted_orders['warehouse']['ground'] = [
-                    order for order in sorted_orders['warehouse']['ground']
-                    if len(order['items']) != 1 or order['items'][0]['sku'] != sku
-                ]
+            # Create warehouse pick list Excel file
+            picklist_path = os.path.join(output_dir, "warehouse_picklist.xlsx")
+            create_warehouse_picklist_excel(sorted_orders['warehouse'], picklist_path)
             
-            # Update the all list
-            sorted_orders['warehouse']['all'] = sorted_orders['warehouse']['hazmat'] + sorted_orders['warehouse']['ground']
-    
-    # Process warehouse orders
-    warehouse_pdf_path = os.path.join(output_dir, "warehouse_labels.pdf")
-    output_files.append(warehouse_pdf_path)
-    
-    # Count SKUs for label counting (e.g., "1 of 5", "2 of 5")
-    sku_counts = defaultdict(int)
-    for order in sorted_orders['warehouse']['all']:
-        if len(order['items']) == 1:
-            sku_counts[order['items'][0]['sku']] += 1
-    
-    # Add page numbers and label counts to warehouse orders
-    page_number = 1
-    sku_counters = defaultdict(int)
-    
-    # Create warehouse PDF with both hazmat and ground orders
-    if sorted_orders['warehouse']['all']:
-        warehouse_pdf = fitz.open()
+            if status_callback:
+                status_callback(f"Warehouse pick list saved to {picklist_path}")
         
-        # Process all warehouse orders
-        for order in sorted_orders['warehouse']['all']:
-            # Add page number to the order for referencing in the picklist
-            order['page_number'] = page_number
-            
-            # Add the order to PDF
-            warehouse_pdf.insert_pdf(order['source_pdf'], 
-                                   from_page=order['page_numbers'][0], 
-                                   to_page=order['page_numbers'][0])
+        # Process packingroom orders
+        packingroom_pdf_path = os.path.join(output_dir, "packingroom_labels.pdf")
+        output_files.append(packingroom_pdf_path)
+        
+        # Add page numbers to packingroom orders
+        page_number = 1
+        
+        if sorted_orders['packingroom']['all']:
+            packingroom_pdf = fitz.open()
             
-            # Add all packing slips with page numbers
-            for j, slip_index in enumerate(order['page_numbers'][1]):
-                slip_page = order['source_pdf'][slip_index]
+            # Process all packingroom orders
+            for order in sorted_orders['packingroom']['all']:
+                # Add page number to the order for referencing
+                order['page_number'] = page_number
                 
-                # Add page number with slip count if multiple slips
-                if len(order['page_numbers'][1]) > 1:
-                    add_page_number_with_slip_count(slip_page, page_number, j + 1, len(order['page_numbers'][1]))
-                else:
-                    add_page_number(slip_page, page_number)
+                # Number the packing slips on the source pages before copying them
+                for j, slip_index in enumerate(order['page_numbers'][1]):
+                    slip_page = order['source_pdf'][slip_index]
+                    slip_size = page_dimensions(slip_page)
+                    
+                    # Add page number with slip count if multiple slips
+                    if len(order['page_numbers'][1]) > 1:
+                        add_page_number_with_slip_count(slip_page, page_number, j + 1, len(order['page_numbers'][1]), slip_size)
+                    else:
+                        add_page_number(slip_page, page_number, slip_size)
                 
-                # Add SKU count for SKUs with qty >= 5 (on first slip only)
-                if j == 0 and len(order['items']) == 1:
-                    sku = order['items'][0]['sku']
-                    if sku_counts[sku] >= 5:
-                        sku_counters[sku] += 1
-                        current_count = sku_counters[sku]
-                        total_count = sku_counts[sku]
-                        add_label_count(slip_page, sku, current_count, total_count)
+                # Add the label and its slips, already annotated, to the PDF
+                insert_order_pages(packingroom_pdf, order)
                 
-                warehouse_pdf.insert_pdf(order['source_pdf'], 
-                                       from_page=slip_index, 
-                                       to_page=slip_index)
+                # Increment page number for the next order
+                page_number += 1
             
-            # Increment page number for the next order
-            page_number += 1
-        
-        warehouse_pdf.save(warehouse_pdf_path)
-        warehouse_pdf.close()
-        
-        if status_callback:
-            status_callback(f"Warehouse labels saved to {warehouse_pdf_path}")
-        
-        # Create warehouse pick list Excel file
-        picklist_path = os.path.join(output_dir, "warehouse_picklist.xlsx")
-        create_warehouse_picklist_excel(sorted_orders['warehouse'], picklist_path)
-        
-        if status_callback:
-            status_callback(f"Warehouse pick list saved to {picklist_path}")
-    
-    # Process packingroom orders
-    packingroom_pdf_path = os.path.join(output_dir, "packingroom_labels.pdf")
-    output_files.append(packingroom_pdf_path)
-    
-    # Add page numbers to packingroom orders
-    page_number = 1
-    
-    if sorted_orders['packingroom']['all']:
-        packingroom_pdf = fitz.open()
-        
-        # Process all packingroom orders
-        for order in sorted_orders['packingroom']['all']:
-            # Add page number to the order for referencing
-            order['page_number'] = page_number
+            packingroom_pdf.save(packingroom_pdf_path)
+            packingroom_pdf.close()
             
-            # Add label
-            packingroom_pdf.insert_pdf(order['source_pdf'], 
-                                     from_page=order['page_numbers'][0], 
-                                     to_page=order['page_numbers'][0])
+            if status_callback:
+                status_callback(f"Packingroom labels saved to {packingroom_pdf_path}")
             
-            # Add all packing slips with page numbers
-            for j, slip_index in enumerate(order['page_numbers'][1]):
-                slip_page = order['source_pdf'][slip_index]
-                
-                # Add page number with slip count if multiple slips
-                if len(order['page_numbers'][1]) > 1:
-                    add_page_number_with_slip_count(slip_page, page_number, j + 1, len(order['page_numbers'][1]))
-                else:
-                    add_page_number(slip_page, page_number)
-                
-                packingroom_pdf.insert_pdf(order['source_pdf'], 
-                                         from_page=slip_index, 
-                                         to_page=slip_index)
+            # Create pick list CSV for packingroom orders
+            csv_output_path = os.path.join(output_dir, "packingroom_pick_list.csv")
+            save_sku_counts_to_csv(sorted_orders['packingroom'], csv_output_path)
             
-            # Increment page number for the next order
-            page_number += 1
-        
-        packingroom_pdf.save(packingroom_pdf_path)
-        packingroom_pdf.close()
-        
-        if status_callback:
-            status_callback(f"Packingroom labels saved to {packingroom_pdf_path}")
-        
-        # Create pick list CSV for packingroom orders
-        csv_output_path = os.path.join(output_dir, "packingroom_pick_list.csv")
-        save_sku_counts_to_csv(sorted_orders['packingroom'], csv_output_path)
-        
-        if status_callback:
-            status_callback(f"Packingroom pick list saved to {csv_output_path}")
-    
-    # Close all source PDFs
-    for order in all_orders:
-        if 'source_pdf' in order:
-            try:
-                if not order['source_pdf'].is_closed:
-                    order['source_pdf'].close()
-            except:
-                pass  # Already closed
+            if status_callback:
+                status_callback(f"Packingroom pick list saved to {csv_output_path}")
+    finally:
+        # Close all source PDFs, also when a step above failed, so the input
+        # files aren't left locked
+        for pdf_document in open_pdfs.values():
+            pdf_document.close()
     
     # Skip moving files to DISCARD folder in web version (files are temporary)
     
@@ -1368,6 +1439,12 @@ def process_pdfs(input_folder, output_folder, hazmat_keywords, auto_open=False,
         seconds = processing_time % 60
         time_str = f"{minutes} min {seconds:.1f} sec"
     
+    duplicate_orders = len(duplicate_tracking_numbers)
+    warehouse = sorted_orders['warehouse']
+    packingroom = sorted_orders['packingroom']
+    warehouse_count = len(warehouse['all'])
+    packingroom_count = len(packingroom['all'])
+    
     # Print summary statistics
     if status_callback:
         status_callback("\n--- ORDER SUMMARY ---")
@@ -1375,22 +1452,25 @@ def process_pdfs(input_folder, output_folder, hazmat_keywords, auto_open=False,
         if multi_slip_orders > 0:
             status_callback(f"Multi-slip Orders: {multi_slip_orders}")
             status_callback(f"Max Slips per Order: {max_slips_per_order}")
-        status_callback(f"Duplicate Orders: {len(duplicate_tracking_numbers)}")
+        status_callback(f"Duplicate Orders: {duplicate_orders}")
         status_callback(f"Processing Time: {time_str}")
-        status_callback(f"Warehouse Orders: {len(sorted_orders['warehouse']['all'])}")
-        status_callback(f"  - Hazmat: {len(sorted_orders['warehouse']['hazmat'])}")
-        status_callback(f"  - Ground: {len(sorted_orders['warehouse']['ground'])}")
-        status_callback(f"Packingroom Orders: {len(sorted_orders['packingroom']['all'])}")
-        status_callback(f"  - Hazmat: {len(sorted_orders['packingroom']['hazmat']['all'])}")
-        status_callback(f"  - Ground: {len(sorted_orders['packingroom']['ground']['all'])}")
-    
-    # Return processing results and counters
+        status_callback(f"Warehouse Orders: {warehouse_count}")
+        status_callback(f"  - Hazmat: {len(warehouse['hazmat'])}")
+        status_callback(f"  - Ground: {len(warehouse['ground'])}")
+        status_callback(f"Packingroom Orders: {packingroom_count}")
+        status_callback(f"  - Hazmat: {len(packingroom['hazmat']['all'])}")
+        status_callback(f"  - Ground: {len(packingroom['ground']['all'])}")
+    
+    # Return processing results and counters; this is built once per run and
+    # callers read it with .get(), so it stays a plain dict
     return {
         'success': True,
         'total_orders': total_orders,
-        'duplicate_orders': len(duplicate_tracking_numbers),
+        'duplicate_orders': duplicate_orders,
         'duplicate_details': duplicate_details,
         'processing_time': time_str,
         'multi_slip_orders': multi_slip_orders,
-        'max_slips_per_order': max_slips_per_order
+        'max_slips_per_order': max_slips_per_order,
+        'warehouse_count': warehouse_count,
+        'packingroom_count': packingroom_count
     }
\ No newline at end of file
@@ -8,29 +8,12 @@ import os
 import sys
 import shutil
 import subprocess
-from pathlib import Path
 
-def create_directory_structure():
-    """Create the required directory structure"""
-    print("📁 Creating directory structure...")
-    
-    directories = [
-        '.streamlit',
-        'assets',
-        'temp',
-        'logs'
-    ]
-    
-    for directory in directories:
-        Path(directory).mkdir(exist_ok=True)
-        print(f"   ✓ Created: {directory}/")
+# Directories the web app expects next to streamlit_app.py
+DIRECTORIES = ('.streamlit', 'assets', 'temp', 'logs')
 
-def create_config_files():
-    """Create configuration files"""
-    print("⚙️ Creating configuration files...")
-    
-    # Create .streamlit/config.toml
-    config_toml = """
+# Generated file contents, stripped once at import
+CONFIG_TOML = """
 [global]
 developmentMode = false
 
@@ -48,14 +31,9 @@ font = "sans serif"
 
 [browser]
 gatherUsageStats = false
-"""
-    
-    with open('.streamlit/config.toml', 'w') as f:
-        f.write(config_toml.strip())
-    print("   ✓ Created: .streamlit/config.toml")
-    
-    # Create .gitignore
-    gitignore_content = """
+""".strip()
+
+GITIGNORE = """
 # Python
 __pycache__/
 *.py[cod]
@@ -107,18 +85,10 @@ DISCARD/
 *.pdf
 *.xlsx
 *.csv
-"""
-    
-    with open('.gitignore', 'w') as f:
-        f.write(gitignore_content.strip())
-    print("   ✓ Created: .gitignore")
+""".strip()
 
-def create_requirements_file():
-    """Create requirements.txt file"""
-    print("📦 Creating requirements.txt...")
-    
-    requirements = """
-streamlit>=1.28.0
+REQUIREMENTS = """
+streamlit>=1.37.0
 pandas>=1.5.0
 pillow>=9.0.0
 PyMuPDF>=1.23.0
@@ -127,17 +97,9 @@ python-dateutil>=2.8.0
 watchdog>=3.0.0
 altair>=4.2.0
 numpy>=1.24.0
-"""
-    
-    with open('requirements.txt', 'w') as f:
-        f.write(requirements.strip())
-    print("   ✓ Created: requirements.txt")
+""".strip()
 
-def create_dockerfile():
-    """Create Dockerfile for containerized deployment"""
-    print("🐳 Creating Dockerfile...")
-    
-    dockerfile_content = """
+DOCKERFILE = """
 FROM python:3.9-slim
 
 # Set working directory
@@ -166,17 +128,9 @@ HEALTHCHECK CMD curl --fail http://localhost:8501/_stcore/health
 
 # Run the application
 CMD ["streamlit", "run", "streamlit_app.py", "--server.address", "0.0.0.0", "--server.port", "8501"]
-"""
-    
-    with open('Dockerfile', 'w') as f:
-        f.write(dockerfile_content.strip())
-    print("   ✓ Created: Dockerfile")
+""".strip()
 
-def create_docker_compose():
-    """Create docker-compose.yml for easy deployment"""
-    print("🐳 Creating docker-compose.yml...")
-    
-    docker_compose_content = """
+DOCKER_COMPOSE = """
 version: '3.8'
 
 services:
@@ -196,18 +150,9 @@ services:
       interval: 30s
       timeout: 10s
       retries: 3
-"""
-    
-    with open('docker-compose.yml', 'w') as f:
-        f.write(docker_compose_content.strip())
-    print("   ✓ Created: docker-compose.yml")
+""".strip()
 
-def create_launch_scripts():
-    """Create platform-specific launch scripts"""
-    print("🚀 Creating launch scripts...")
-    
-    # Windows batch file
-    windows_script = """
+WINDOWS_SCRIPT = """
 @echo off
 echo Starting ZENIA PDF Processor Web App...
 echo.
@@ -216,37 +161,18 @@ echo Press Ctrl+C to stop the application
 echo.
 python -m streamlit run streamlit_app.py --server.address localhost --server.port 8501
 pause
-"""
-    
-    with open('start_app.bat', 'w') as f:
-        f.write(windows_script.strip())
-    print("   ✓ Created: start_app.bat (Windows)")
-    
-    # Unix shell script
-    unix_script = """#!/bin/bash
+""".strip()
+
+UNIX_SCRIPT = """#!/bin/bash
 echo "Starting ZENIA PDF Processor Web App..."
 echo ""
 echo "Opening browser at http://localhost:8501"
 echo "Press Ctrl+C to stop the application"
 echo ""
 python3 -m streamlit run streamlit_app.py --server.address localhost --server.port 8501
-"""
-    
-    with open('start_app.sh', 'w') as f:
-        f.write(unix_script.strip())
-    
-    # Make shell script executable
-    try:
-        os.chmod('start_app.sh', 0o755)
-        print("   ✓ Created: start_app.sh (Linux/macOS)")
-    except:
-        print("   ⚠ Created: start_app.sh (you may need to make it executable)")
+""".strip()
 
-def create_readme():
-    """Create a comprehensive README file"""
-    print("📖 Creating README.md...")
-    
-    readme_content = """
+README = """
 # ZENIA PDF Label Processor - Web Edition
 
 A modern web application for processing PDF shipping labels and packing slips, built with Streamlit.
@@ -350,18 +276,88 @@ For issues or questions, check the processing log in the web interface.
 ---
 
 **ZENIA PDF Processor** - Streamlining your shipping operations
-"""
+""".strip()
+
+def write_files(files):
+    """Write (path, content) pairs in one pass"""
+    for path, content in files:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+def create_directory_structure():
+    """Create the required directory structure"""
+    for directory in DIRECTORIES:
+        os.makedirs(directory, exist_ok=True)
+    
+    # One write per phase instead of one per line
+    print("\n".join([
+        "📁 Creating directory structure...",
+        *(f"   ✓ Created: {directory}/" for directory in DIRECTORIES),
+    ]))
+
+def create_config_files():
+    """Create configuration files"""
+    write_files([
+        ('.streamlit/config.toml', CONFIG_TOML),
+        ('.gitignore', GITIGNORE),
+    ])
+    print("⚙️ Creating configuration files...\n"
+          "   ✓ Created: .streamlit/config.toml\n"
+          "   ✓ Created: .gitignore")
+
+def create_requirements_file():
+    """Create requirements.txt file"""
+    write_files([('requirements.txt', REQUIREMENTS)])
+    print("📦 Creating requirements.txt...\n"
+          "   ✓ Created: requirements.txt")
+
+def create_dockerfile():
+    """Create Dockerfile for containerized deployment"""
+    write_files([('Dockerfile', DOCKERFILE)])
+    print("🐳 Creating Dockerfile...\n"
+          "   ✓ Created: Dockerfile")
+
+def create_docker_compose():
+    """Create docker-compose.yml for easy deployment"""
+    write_files([('docker-compose.yml', DOCKER_COMPOSE)])
+    print("🐳 Creating docker-compose.yml...\n"
+          "   ✓ Created: docker-compose.yml")
+
+def create_launch_scripts():
+    """Create platform-specific launch scripts"""
+    write_files([
+        ('start_app.bat', WINDOWS_SCRIPT),
+        ('start_app.sh', UNIX_SCRIPT),
+    ])
     
-    with open('README.md', 'w', encoding='utf-8') as f:
-        f.write(readme_content.strip())
-    print("   ✓ Created: README.md")
+    # Make shell script executable
+    try:
+        os.chmod('start_app.sh', 0o755)
+        unix_status = "   ✓ Created: start_app.sh (Linux/macOS)"
+    except:
+        unix_status = "   ⚠ Created: start_app.sh (you may need to make it executable)"
+    print("🚀 Creating launch scripts...\n"
+          "   ✓ Created: start_app.bat (Windows)\n"
+          + unix_status)
+
+def create_readme():
+    """Create a comprehensive README file"""
+    write_files([('README.md', README)])
+    print("📖 Creating README.md...\n"
+          "   ✓ Created: README.md")
 
 def install_dependencies():
     """Install Python dependencies"""
     print("🔧 Installing Python dependencies...")
     
     try:
-        subprocess.check_call([sys.executable, '-m', 'pip', 'install', '-r', 'requirements.txt'])
+        # pip inherits our stdout, so its progress already streams live;
+        # prefer wheels so nothing falls back to a slow source build
+        subprocess.check_call([
+            sys.executable, '-m', 'pip', 'install',
+            '--disable-pip-version-check', '--no-input', '--prefer-binary',
+            '-r', 'requirements.txt'
+        ])
         print("   ✓ Dependencies installed successfully!")
         return True
     except subprocess.CalledProcessError:
@@ -371,34 +367,31 @@ def install_dependencies():
 def check_existing_files():
     """Check for existing core files"""
     required_files = ['streamlit_app.py', 'order_processor.py']
-    missing_files = []
     
-    for file in required_files:
-        if not Path(file).exists():
-            missing_files.append(file)
+    # One directory listing instead of a stat per required file
+    with os.scandir('.') as entries:
+        present = {entry.name for entry in entries if entry.is_file()}
     
-    return missing_files
+    return [file for file in required_files if file not in present]
 
 def main():
     """Main setup function"""
-    print("=" * 60)
-    print("🏢 ZENIA PDF PROCESSOR - SETUP SCRIPT")
-    print("=" * 60)
-    print()
+    print("=" * 60 + "\n"
+          "🏢 ZENIA PDF PROCESSOR - SETUP SCRIPT\n"
+          + "=" * 60 + "\n")
     
     # Check for existing core files
     missing_files = check_existing_files()
     if missing_files:
-        print(f"❌ Missing core files: {', '.join(missing_files)}")
-        print("Please ensure you have:")
-        print("- streamlit_app.py (main application)")
-        print("- order_processor.py (processing logic)")
-        print()
-        print("Copy these files to the current directory and run the setup again.")
+        print(f"❌ Missing core files: {', '.join(missing_files)}\n"
+              "Please ensure you have:\n"
+              "- streamlit_app.py (main application)\n"
+              "- order_processor.py (processing logic)\n"
+              "\n"
+              "Copy these files to the current directory and run the setup again.")
         return
     
-    print("✅ Core application files found!")
-    print()
+    print("✅ Core application files found!\n")
     
     # Create directory structure
     create_directory_structure()
@@ -429,22 +422,21 @@ def main():
     install_choice = input("Install Python dependencies now? (y/n): ").lower().strip()
     if install_choice == 'y':
         if install_dependencies():
-            print()
-            print("🎉 Setup completed successfully!")
-            print()
-            print("Next steps:")
-            print("1. Run 'streamlit run streamlit_app.py' to start the app")
-            print("2. Or use the launch scripts (start_app.bat/start_app.sh)")
-            print("3. Open http://localhost:8501 in your browser")
+            print("\n"
+                  "🎉 Setup completed successfully!\n"
+                  "\n"
+                  "Next steps:\n"
+                  "1. Run 'streamlit run streamlit_app.py' to start the app\n"
+                  "2. Or use the launch scripts (start_app.bat/start_app.sh)\n"
+                  "3. Open http://localhost:8501 in your browser")
         else:
-            print("⚠️ Setup completed but dependencies failed to install")
-            print("Please run 'pip install -r requirements.txt' manually")
+            print("⚠️ Setup completed but dependencies failed to install\n"
+                  "Please run 'pip install -r requirements.txt' manually")
     else:
-        print("🎉 Setup completed!")
-        print("Remember to install dependencies: pip install -r requirements.txt")
+        print("🎉 Setup completed!\n"
+              "Remember to install dependencies: pip install -r requirements.txt")
     
-    print()
-    print("=" * 60)
+    print("\n" + "=" * 60)
 
 if __name__ == "__main__":
     main()
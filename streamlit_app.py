@@ -1,14 +1,21 @@
 import streamlit as st
+import atexit
 import os
+import queue
+import re
+import shutil
 import tempfile
 import zipfile
-import time
 from datetime import datetime
 import pandas as pd
 from io import BytesIO
 import base64
+import hashlib
 import multiprocessing
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 
 # Import your existing order processor
 from order_processor import process_pdfs, HAZMAT_KEYWORDS
@@ -21,8 +28,61 @@ st.set_page_config(
     initial_sidebar_state="collapsed"  # Hide sidebar
 )
 
-# Apply theme-based CSS
-def apply_custom_css(is_dark_mode=False):
+# Older log lines fall off so long sessions keep a bounded log
+MAX_LOG_MESSAGES = 500
+
+# Progress percentage reached by each processing stage's status message
+STATUS_STAGE_PROGRESS = {
+    "Starting": 5,
+    "Looking for": 5,
+    "Processing:": 25,
+    "Found": 25,
+    "Sorting": 50,
+    "Warehouse labels saved": 75,
+    "Packingroom labels saved": 85,
+    "pick list saved": 95
+}
+STATUS_STAGE_PATTERN = re.compile("|".join(re.escape(stage) for stage in STATUS_STAGE_PROGRESS))
+
+# Download MIME type for each output file extension
+OUTPUT_MIME_TYPES = {
+    ".pdf": "application/pdf",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".csv": "text/csv"
+}
+
+# Individual download buttons shown per page
+DOWNLOADS_PER_PAGE = 25
+
+# Stats cards markup; only the four values change between renders
+STATS_HTML = """
+    <div class="stats-container">
+        <div class="stat-card stat-orders">
+            <div class="stat-icon">📦</div>
+            <div class="stat-value">{total_orders}</div>
+            <div class="stat-label">Orders</div>
+        </div>
+        <div class="stat-card stat-pages">
+            <div class="stat-icon">📄</div>
+            <div class="stat-value">{total_pages}</div>
+            <div class="stat-label">Pages</div>
+        </div>
+        <div class="stat-card stat-duplicates">
+            <div class="stat-icon">⚠️</div>
+            <div class="stat-value">{duplicate_orders}</div>
+            <div class="stat-label">Duplicates</div>
+        </div>
+        <div class="stat-card stat-time">
+            <div class="stat-icon">⚡</div>
+            <div class="stat-value">{processing_time}</div>
+            <div class="stat-label">Time</div>
+        </div>
+    </div>
+    """
+
+# Theme CSS only depends on the mode, so each variant is formatted once per process
+@lru_cache(maxsize=2)
+def build_custom_css(is_dark_mode=False):
     theme_colors = {
         "bg_primary": "#f8fafc" if is_dark_mode else "#0f172a",
         "bg_secondary": "#f1f5f9" if is_dark_mode else "#1e293b", 
@@ -33,7 +93,7 @@ def apply_custom_css(is_dark_mode=False):
         "border": "#e2e8f0" if is_dark_mode else "#334155 "
     }
     
-    st.markdown(f"""
+    return f"""
     <style>
         /* Import Google Fonts */
         @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
@@ -140,8 +200,8 @@ def apply_custom_css(is_dark_mode=False):
             transition: width 0.3s ease;
         }}
         
-        /* Log styling */
-        .log-container {{
+        /* Log styling (the log renders as a plain st.code block) */
+        [data-testid="stCode"] pre {{
             background: {theme_colors["card_bg"]};
             color: {theme_colors["text_primary"]};
             padding: 1rem;
@@ -212,12 +272,18 @@ def apply_custom_css(is_dark_mode=False):
             background: linear-gradient(135deg, #10b981 0%, #059669 100%) !important;
         }}
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+# Apply theme-based CSS
+def apply_custom_css(is_dark_mode=False):
+    st.markdown(build_custom_css(is_dark_mode), unsafe_allow_html=True)
 
 def initialize_session_state():
     """Initialize session state variables"""
     if 'processing' not in st.session_state:
         st.session_state.processing = False
+    if 'progress' not in st.session_state:
+        st.session_state.progress = 0
     if 'total_orders' not in st.session_state:
         st.session_state.total_orders = 0
     if 'duplicate_orders' not in st.session_state:
@@ -229,17 +295,27 @@ def initialize_session_state():
     if 'duplicate_details' not in st.session_state:
         st.session_state.duplicate_details = []
     if 'log_messages' not in st.session_state:
-        st.session_state.log_messages = []
+        st.session_state.log_messages = deque(maxlen=MAX_LOG_MESSAGES)
     if 'output_files' not in st.session_state:
         st.session_state.output_files = {}
     if 'dark_mode' not in st.session_state:
         st.session_state.dark_mode = False
     if 'hazmat_sticker_enabled' not in st.session_state:
         st.session_state.hazmat_sticker_enabled = True  # Enabled by default
+    if 'input_dir' not in st.session_state:
+        # Working folders live for the whole session and are emptied after each
+        # batch instead of being created and removed per click. They sit in a
+        # per-session folder under the app's temporary root, which is removed
+        # once at exit
+        st.session_state.session_dir = tempfile.mkdtemp(prefix="session_", dir=get_temp_root())
+        st.session_state.input_dir = os.path.join(st.session_state.session_dir, "input")
+        st.session_state.output_dir = os.path.join(st.session_state.session_dir, "output")
+        os.mkdir(st.session_state.input_dir)
+        os.mkdir(st.session_state.output_dir)
 
-def log_message(message):
-    """Add a message to the log"""
-    timestamp = datetime.now().strftime("%H:%M:%S")
+def log_message(message, when=None):
+    """Add a message to the log, stamped with when (default: now)"""
+    timestamp = (when or datetime.now()).strftime("%H:%M:%S")
     formatted_message = f"[{timestamp}] {message}"
     st.session_state.log_messages.append(formatted_message)
 
@@ -257,30 +333,12 @@ def create_stats_dashboard():
     st.markdown("### 📊 Batch Statistics")
     
     # Stats cards
-    st.markdown(f"""
-    <div class="stats-container">
-        <div class="stat-card stat-orders">
-            <div class="stat-icon">📦</div>
-            <div class="stat-value">{st.session_state.total_orders}</div>
-            <div class="stat-label">Orders</div>
-        </div>
-        <div class="stat-card stat-pages">
-            <div class="stat-icon">📄</div>
-            <div class="stat-value">{st.session_state.total_pages}</div>
-            <div class="stat-label">Pages</div>
-        </div>
-        <div class="stat-card stat-duplicates">
-            <div class="stat-icon">⚠️</div>
-            <div class="stat-value">{st.session_state.duplicate_orders}</div>
-            <div class="stat-label">Duplicates</div>
-        </div>
-        <div class="stat-card stat-time">
-            <div class="stat-icon">⚡</div>
-            <div class="stat-value">{st.session_state.processing_time}</div>
-            <div class="stat-label">Time</div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(STATS_HTML.format(
+        total_orders=st.session_state.total_orders,
+        total_pages=st.session_state.total_pages,
+        duplicate_orders=st.session_state.duplicate_orders,
+        processing_time=st.session_state.processing_time
+    ), unsafe_allow_html=True)
 
 def create_progress_bar(progress_value):
     """Create a progress bar"""
@@ -301,27 +359,78 @@ def create_progress_bar(progress_value):
     return progress_bar
 
 def create_download_all_zip():
-    """Create a ZIP file containing all output files for download"""
+    """Write a ZIP of all output files to disk and return its path"""
     if not st.session_state.output_files:
         return None
     
-    zip_buffer = BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        for filename, file_data in st.session_state.output_files.items():
-            zip_file.writestr(filename, file_data)
+    # Each batch's results live under a fresh folder, so the file paths
+    # identify the batch; the archive is only rebuilt when they change
+    zip_key = tuple(st.session_state.output_files.items())
+    if st.session_state.get('zip_key') == zip_key:
+        return st.session_state.zip_path
     
-    zip_buffer.seek(0)
-    return zip_buffer.getvalue()
+    # The archive is written to a temporary file instead of held in memory;
+    # the previous batch's archive is deleted
+    if st.session_state.get('zip_path'):
+        remove_file(st.session_state.zip_path)
+    fd, st.session_state.zip_path = tempfile.mkstemp(prefix="results_", suffix=".zip",
+                                                     dir=st.session_state.session_dir)
+    os.close(fd)
+    
+    # Stored, not deflated: the PDFs and spreadsheets inside are already
+    # compressed, so deflating them again costs CPU for little gain
+    with zipfile.ZipFile(st.session_state.zip_path, 'w', zipfile.ZIP_STORED) as zip_file:
+        for filename, file_path in st.session_state.output_files.items():
+            zip_file.write(file_path, filename)
+    
+    st.session_state.zip_key = zip_key
+    return st.session_state.zip_path
+
+def clear_results():
+    """Delete the current batch's result files and download-all ZIP"""
+    if st.session_state.get('results_dir'):
+        shutil.rmtree(st.session_state.results_dir, ignore_errors=True)
+        st.session_state.results_dir = None
+    if st.session_state.get('zip_path'):
+        remove_file(st.session_state.zip_path)
+        st.session_state.zip_path = None
+        st.session_state.zip_key = None
+
+def remove_file(path):
+    """Delete a file, ignoring one that is already gone"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def save_uploaded_file(uploaded_file, temp_dir):
+    """Save one uploaded file to the temporary directory"""
+    file_path = os.path.join(temp_dir, uploaded_file.name)
+    with open(file_path, "wb") as f:
+        # getbuffer() is a view of the upload, so nothing is copied in memory
+        f.write(uploaded_file.getbuffer())
+    return file_path
+
+def upload_digest(uploaded_file):
+    """Content hash of an uploaded file"""
+    return hashlib.blake2b(uploaded_file.getbuffer(), digest_size=16).digest()
 
 def save_uploaded_files(uploaded_files, temp_dir):
-    """Save uploaded files to temporary directory"""
-    saved_files = []
-    for uploaded_file in uploaded_files:
-        file_path = os.path.join(temp_dir, uploaded_file.name)
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        saved_files.append(file_path)
-    return saved_files
+    """Save uploaded files to temporary directory, skipping identical copies"""
+    if not uploaded_files:
+        return []
+    
+    # Hashing and file writes both release the GIL, so threads overlap them
+    with ThreadPoolExecutor(max_workers=min(8, len(uploaded_files))) as executor:
+        # The same PDF dropped twice would otherwise be processed twice
+        seen_digests = set()
+        unique_files = []
+        for digest, uploaded_file in zip(executor.map(upload_digest, uploaded_files), uploaded_files):
+            if digest not in seen_digests:
+                seen_digests.add(digest)
+                unique_files.append(uploaded_file)
+        return list(executor.map(save_uploaded_file, unique_files,
+                                 [temp_dir] * len(unique_files)))
 
 def create_download_zip(output_dir):
     """Create a zip file containing all output files"""
@@ -337,106 +446,234 @@ def create_download_zip(output_dir):
     zip_buffer.seek(0)
     return zip_buffer.getvalue()
 
-def process_files_async(input_dir, output_dir, keywords, auto_open=False, hazmat_sticker_enabled=True):
-    """Process files and update session state"""
-    try:
-        # Initialize progress
-        progress_placeholder = st.empty()
-        
-        # Custom status callback for Streamlit
-        def status_callback(message):
-            log_message(message)
-            # Update progress based on message content with better tracking
-            if "Starting" in message or "Looking for" in message:
-                with progress_placeholder.container():
-                    create_progress_bar(5)
-            elif "Processing:" in message or "Found" in message:
-                with progress_placeholder.container():
-                    create_progress_bar(25)
-            elif "Sorting" in message:
-                with progress_placeholder.container():
-                    create_progress_bar(50)
-            elif "Warehouse labels saved" in message:
-                with progress_placeholder.container():
-                    create_progress_bar(75)
-            elif "Packingroom labels saved" in message:
-                with progress_placeholder.container():
-                    create_progress_bar(85)
-            elif "pick list saved" in message:
-                with progress_placeholder.container():
-                    create_progress_bar(95)
-        
-        # Process PDFs with hazmat sticker setting
-        result = process_pdfs(
+def clear_directory(path):
+    """Remove everything inside path, keeping the folder itself"""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                remove_file(entry.path)  # Files still open on Windows are left behind
+
+def status_progress(message):
+    """Map a processing status message to a progress percentage, or None"""
+    # One scan for every stage instead of a substring test per stage
+    match = STATUS_STAGE_PATTERN.search(message)
+    return STATUS_STAGE_PROGRESS[match.group()] if match else None
+
+def start_processing(uploaded_files, keywords, auto_open=False, hazmat_sticker_enabled=True):
+    """Save the uploads and run process_pdfs on the background executor"""
+    input_dir = st.session_state.input_dir
+    output_dir = st.session_state.output_dir
+    
+    # Save uploaded files
+    log_message(f"Saving {len(uploaded_files)} uploaded files...")
+    saved_files = save_uploaded_files(uploaded_files, input_dir)
+    if len(saved_files) < len(uploaded_files):
+        log_message(f"Skipped {len(uploaded_files) - len(saved_files)} duplicate uploaded files")
+    
+    # The worker thread can't touch session state, so its status messages are
+    # queued with their time and drained by the status fragment
+    messages = queue.Queue()
+    
+    def status_callback(message):
+        messages.put((datetime.now(), message))
+    
+    st.session_state.processing_job = {
+        'future': get_processing_executor().submit(
+            process_pdfs,
             input_dir,
             output_dir,
             keywords,
             auto_open,
             status_callback,
             hazmat_sticker_enabled  # Pass the hazmat sticker setting
-        )
-        
-        # Update session state with results
-        if isinstance(result, dict) and result.get('success', False):
-            # FIX: Calculate total orders correctly from log messages
-            warehouse_count = 0
-            packingroom_count = 0
-            
-            # Parse the log messages to get correct counts
-            for message in st.session_state.log_messages:
-                if "Warehouse Orders:" in message:
-                    warehouse_count = int(message.split("Warehouse Orders:")[1].strip())
-                elif "Packingroom Orders:" in message:
-                    packingroom_count = int(message.split("Packingroom Orders:")[1].strip())
-            
-            # Calculate correct total
-            actual_total_orders = warehouse_count + packingroom_count
-            
-            # Update session state with corrected values
-            st.session_state.total_orders = actual_total_orders if actual_total_orders > 0 else result.get('total_orders', 0)
-            st.session_state.duplicate_orders = result.get('duplicate_orders', 0)
-            st.session_state.duplicate_details = result.get('duplicate_details', [])
-            st.session_state.processing_time = result.get('processing_time', "")
-            st.session_state.total_pages = st.session_state.total_orders * 2
-            
-            # FINAL PROGRESS - Set to 100% when completely done
-            with progress_placeholder.container():
-                create_progress_bar(100)
-            
-            log_message("✅ Processing completed successfully!")
-            log_message(f"📊 Updated stats: {st.session_state.total_orders} total orders")
-            
-            # Find and store output files
-            timestamp_dirs = [d for d in os.listdir(os.path.join(output_dir, "Output")) 
-                            if os.path.isdir(os.path.join(output_dir, "Output", d))]
-            
-            if timestamp_dirs:
-                latest_dir = max(timestamp_dirs)
-                output_files_dir = os.path.join(output_dir, "Output", latest_dir)
-                
-                # Store output files in session state
-                st.session_state.output_files = {}
-                for file in os.listdir(output_files_dir):
-                    file_path = os.path.join(output_files_dir, file)
-                    if os.path.isfile(file_path):
-                        with open(file_path, 'rb') as f:
-                            st.session_state.output_files[file] = f.read()
-            
-            return True
-        else:
-            # Set progress to 0 if failed
-            with progress_placeholder.container():
-                create_progress_bar(0)
-            log_message("❌ Processing failed")
-            return False
-            
+        ),
+        'messages': messages
+    }
+    st.session_state.progress = 0
+    st.session_state.processing = True
+
+def queued_status_messages(messages):
+    """Yield the (time, message) pairs queued so far, without blocking"""
+    while True:
+        try:
+            yield messages.get_nowait()
+        except queue.Empty:
+            return
+
+def poll_processing():
+    """Log queued status messages; finish the batch and return True once it is done"""
+    job = st.session_state.processing_job
+    
+    # Check before draining so no message queued by a finished batch is missed
+    done = job['future'].done()
+    for when, message in queued_status_messages(job['messages']):
+        log_message(message, when)
+        progress = status_progress(message)
+        if progress is not None:
+            st.session_state.progress = progress
+    
+    if not done:
+        return False
+    
+    try:
+        success = finish_processing(job['future'].result(), st.session_state.output_dir)
     except Exception as e:
-        # Set progress to 0 if error
-        with progress_placeholder.container():
-            create_progress_bar(0)
         log_message(f"❌ Error: {str(e)}")
+        success = False
+    
+    if not success:
+        # Set progress to 0 if failed
+        st.session_state.progress = 0
+    st.session_state.batch_success = success
+    st.session_state.processing = False
+    del st.session_state.processing_job
+    
+    clear_directory(st.session_state.input_dir)
+    clear_directory(st.session_state.output_dir)
+    return True
+
+def finish_processing(result, output_dir):
+    """Update session state from a finished batch's result"""
+    # Update session state with results
+    if isinstance(result, dict) and result.get('success', False):
+        # FIX: Calculate total orders correctly from the sorted order counts
+        warehouse_count = result.get('warehouse_count', 0)
+        packingroom_count = result.get('packingroom_count', 0)
+        
+        # Calculate correct total
+        actual_total_orders = warehouse_count + packingroom_count
+        
+        # Update session state with corrected values
+        st.session_state.total_orders = actual_total_orders if actual_total_orders > 0 else result.get('total_orders', 0)
+        st.session_state.duplicate_orders = result.get('duplicate_orders', 0)
+        st.session_state.duplicate_details = result.get('duplicate_details', [])
+        st.session_state.processing_time = result.get('processing_time', "")
+        st.session_state.total_pages = st.session_state.total_orders * 2
+        
+        # FINAL PROGRESS - Set to 100% when completely done
+        st.session_state.progress = 100
+        
+        log_message("✅ Processing completed successfully!")
+        log_message(f"📊 Updated stats: {st.session_state.total_orders} total orders")
+        
+        # Find and store output files
+        # The folder names are 12-hour "%I-%M_%m-%d-%y" stamps that don't sort
+        # chronologically, so pick the newest by mtime; scandir entries
+        # already know their type
+        with os.scandir(os.path.join(output_dir, "Output")) as entries:
+            latest_dir = max((entry for entry in entries if entry.is_dir()),
+                             key=lambda entry: entry.stat().st_mtime, default=None)
+        
+        if latest_dir:
+            output_files_dir = latest_dir.path
+            
+            # Results move out of the temporary output folder so they outlive
+            # it; the previous batch's results are deleted
+            clear_results()
+            st.session_state.results_dir = tempfile.mkdtemp(prefix="results_", dir=st.session_state.session_dir)
+            
+            # Store output file paths in session state; downloads read them
+            # from disk instead of keeping every file in memory
+            st.session_state.output_files = {}
+            with os.scandir(output_files_dir) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        st.session_state.output_files[entry.name] = shutil.move(entry.path, st.session_state.results_dir)
+        
+        return True
+    else:
+        log_message("❌ Processing failed")
         return False
 
+def show_batch_result():
+    """Show the outcome of the batch that just finished, once"""
+    batch_success = st.session_state.pop('batch_success', None)
+    if batch_success:
+        # Show success message with updated stats
+        st.success(f"""
+        🎉 **Processing Complete!**
+        
+        - **Total Orders:** {st.session_state.total_orders}
+        - **Total Pages:** {st.session_state.total_pages}
+        - **Duplicate Orders:** {st.session_state.duplicate_orders}
+        - **Processing Time:** {st.session_state.processing_time}
+        - **Hazmat Stickers:** {"Added" if st.session_state.hazmat_sticker_enabled else "Disabled"}
+        """)
+        
+        # Show duplicate warnings if any
+        if st.session_state.duplicate_orders > 0:
+            st.warning(f"""
+            ⚠️ **{st.session_state.duplicate_orders} Duplicate Orders Detected!**
+            
+            First few duplicates:
+            """)
+            for detail in st.session_state.duplicate_details[:5]:
+                st.markdown(f"- {detail}")
+            if len(st.session_state.duplicate_details) > 5:
+                st.markdown(f"... and {len(st.session_state.duplicate_details) - 5} more")
+    elif batch_success is False:
+        st.error("❌ Processing failed. Check the log for details.")
+
+# Batches run off the script thread so the page stays responsive. The script
+# re-executes on every rerun, so the executor is a cached resource shared by
+# every session instead of a module global rebuilt each time
+@st.cache_resource
+def get_processing_executor():
+    return ThreadPoolExecutor(max_workers=2)
+
+# One temporary root for the whole app: sessions create their folders inside
+# it, so a single cleanup at exit covers them all
+@st.cache_resource
+def get_temp_root():
+    temp_root = tempfile.mkdtemp(prefix="zenia_")
+    atexit.register(shutil.rmtree, temp_root, ignore_errors=True)
+    return temp_root
+
+# Button callbacks run before the rerun a click triggers, so the page renders
+# the new state directly instead of needing a second st.rerun()
+def toggle_theme():
+    """Switch between the light and dark theme"""
+    st.session_state.dark_mode = not st.session_state.dark_mode
+
+def reset_all():
+    """Reset the batch stats, log and results"""
+    for key in ['total_orders', 'duplicate_orders', 'total_pages', 
+              'processing_time', 'duplicate_details', 'output_files']:
+        st.session_state[key] = [] if key == 'duplicate_details' else (0 if 'orders' in key or 'pages' in key else ({} if key == 'output_files' else "0.0s"))
+    st.session_state.log_messages = deque(maxlen=MAX_LOG_MESSAGES)
+    clear_results()
+
+def render_progress():
+    """Poll a running batch and render its progress"""
+    if st.session_state.processing and poll_processing():
+        # The batch just finished; rerun the whole page to show its results
+        st.rerun()
+    
+    # Progress section (only show when processing or when just completed)
+    if st.session_state.processing or st.session_state.total_orders > 0:
+        # Show appropriate progress based on state
+        if st.session_state.processing:
+            # Show dynamic progress during processing
+            create_progress_bar(st.session_state.progress)
+        elif st.session_state.total_orders > 0:
+            # Show completion status when done
+            create_progress_bar(100)
+
+def render_log():
+    """Render the last 15 processing log messages"""
+    st.markdown("### 📝 Processing Log")
+    
+    # Create log container; plain text skips the markdown renderer
+    log_messages = st.session_state.log_messages
+    log_content = "\n".join(islice(log_messages, max(0, len(log_messages) - 15), None))  # Show last 15 messages
+    
+    st.code(
+        log_content or "No log messages yet...\nUpload PDFs and click Process to begin.",
+        language=None
+    )
+
 def main():
     """Main application function"""
     initialize_session_state()
@@ -456,10 +693,8 @@ def main():
         
         with controls_col1:
             # Theme toggle
-            if st.button("☀️ Light Mode" if not st.session_state.dark_mode else "🌙 Dark Mode", 
-                        key="theme_toggle"):
-                st.session_state.dark_mode = not st.session_state.dark_mode
-                st.rerun()
+            st.button("☀️ Light Mode" if not st.session_state.dark_mode else "🌙 Dark Mode", 
+                      key="theme_toggle", on_click=toggle_theme)
         
         with controls_col2:
             # Hazmat sticker toggle
@@ -472,12 +707,7 @@ def main():
         
         with controls_col3:
             # Reset button
-            if st.button("🔄 Reset All", key="reset_all"):
-                # Reset session state
-                for key in ['total_orders', 'duplicate_orders', 'total_pages', 
-                          'processing_time', 'duplicate_details', 'log_messages', 'output_files']:
-                    st.session_state[key] = [] if key in ['duplicate_details', 'log_messages'] else (0 if 'orders' in key or 'pages' in key else ({} if key == 'output_files' else "0.0s"))
-                st.rerun()
+            st.button("🔄 Reset All", key="reset_all", on_click=reset_all)
         
         st.markdown("---")
         
@@ -535,91 +765,34 @@ def main():
         
         st.markdown("---")
         
-        # Stats and Progress section
+        # Start processing before the status section renders, so it polls the batch
+        if process_button and uploaded_files and not st.session_state.processing:
+            # Parse keywords, stripping each one once
+            keywords = [k for k in (k.strip() for k in hazmat_keywords.split(",")) if k]
+            
+            start_processing(
+                uploaded_files,
+                keywords,
+                auto_open,
+                st.session_state.hazmat_sticker_enabled  # Pass hazmat sticker setting
+            )
+        
+        # Stats and Progress section; while a batch runs only the progress and
+        # log fragments refresh themselves. The stats cards change only when a
+        # batch finishes, which reruns the whole page anyway
+        run_every = 0.5 if st.session_state.processing else None
         stats_col1, stats_col2 = st.columns([2, 1])
         
         with stats_col1:
             # Stats dashboard
             create_stats_dashboard()
-            
-            # Progress section (only show when processing or when just completed)
-            if st.session_state.processing or st.session_state.total_orders > 0:
-                # Show appropriate progress based on state
-                if st.session_state.processing:
-                    # Show dynamic progress during processing
-                    pass  # Progress updates are handled in the callback
-                elif st.session_state.total_orders > 0:
-                    # Show completion status when done
-                    create_progress_bar(100)
+            st.fragment(render_progress, run_every=run_every)()
         
         with stats_col2:
             # Processing log
-            st.markdown("### 📝 Processing Log")
-            
-            # Create log container
-            log_content = "\n".join(st.session_state.log_messages[-15:])  # Show last 15 messages
-            
-            st.markdown(f"""
-            <div class="log-container">
-                {log_content.replace(chr(10), '<br>') if log_content else 'No log messages yet...<br>Upload PDFs and click Process to begin.'}
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Process files
-        if process_button and uploaded_files:
-            st.session_state.processing = True
-            
-            # Create temporary directories
-            with tempfile.TemporaryDirectory() as temp_input_dir:
-                with tempfile.TemporaryDirectory() as temp_output_dir:
-                    
-                    # Save uploaded files
-                    log_message(f"Saving {len(uploaded_files)} uploaded files...")
-                    save_uploaded_files(uploaded_files, temp_input_dir)
-                    
-                    # Parse keywords
-                    keywords = [k.strip() for k in hazmat_keywords.split(",") if k.strip()]
-                    
-                    # Process files with progress indicator
-                    with st.spinner("Processing PDF files..."):
-                        success = process_files_async(
-                            temp_input_dir,
-                            temp_output_dir,
-                            keywords,
-                            auto_open,
-                            st.session_state.hazmat_sticker_enabled  # Pass hazmat sticker setting
-                        )
-                    
-                    if success:
-                        # Show success message with updated stats
-                        st.success(f"""
-                        🎉 **Processing Complete!**
-                        
-                        - **Total Orders:** {st.session_state.total_orders}
-                        - **Total Pages:** {st.session_state.total_pages}
-                        - **Duplicate Orders:** {st.session_state.duplicate_orders}
-                        - **Processing Time:** {st.session_state.processing_time}
-                        - **Hazmat Stickers:** {"Added" if st.session_state.hazmat_sticker_enabled else "Disabled"}
-                        """)
-                        
-                        # Show duplicate warnings if any
-                        if st.session_state.duplicate_orders > 0:
-                            st.warning(f"""
-                            ⚠️ **{st.session_state.duplicate_orders} Duplicate Orders Detected!**
-                            
-                            First few duplicates:
-                            """)
-                            for detail in st.session_state.duplicate_details[:5]:
-                                st.markdown(f"- {detail}")
-                            if len(st.session_state.duplicate_details) > 5:
-                                st.markdown(f"... and {len(st.session_state.duplicate_details) - 5} more")
-                        
-                        # Force update the stats display
-                        st.rerun()
-                    else:
-                        st.error("❌ Processing failed. Check the log for details.")
-            
-            st.session_state.processing = False
+            st.fragment(render_log, run_every=run_every)()
+        
+        show_batch_result()
         
         # Download section
         if st.session_state.output_files:
@@ -630,47 +803,52 @@ def main():
             
             with download_col1:
                 # Download All button - make it prominent
-                zip_data = create_download_all_zip()
-                if zip_data:
+                zip_path = create_download_all_zip()
+                if zip_path:
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    st.download_button(
-                        label="📦 Download All Files (ZIP)",
-                        data=zip_data,
-                        file_name=f"ZENIA_PDF_Results_{timestamp}.zip",
-                        mime="application/zip",
-                        key="download_all",
-                        help="Download all processed files in a single ZIP archive",
-                        type="primary",
-                        use_container_width=True
-                    )
+                    with open(zip_path, 'rb') as zip_file:
+                        st.download_button(
+                            label="📦 Download All Files (ZIP)",
+                            data=zip_file,
+                            file_name=f"ZENIA_PDF_Results_{timestamp}.zip",
+                            mime="application/zip",
+                            key="download_all",
+                            help="Download all processed files in a single ZIP archive",
+                            type="primary",
+                            use_container_width=True
+                        )
                     
                     st.markdown("**✅ All files ready for download!**")
             
             with download_col2:
                 # Individual download buttons in a more compact layout
-                st.markdown("**📄 Individual Downloads:**")
-                
-                # Create download buttons for each output file in a cleaner format
-                for filename, file_data in st.session_state.output_files.items():
-                    file_ext = os.path.splitext(filename)[1]
-                    mime_type = "application/pdf" if file_ext == ".pdf" else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" if file_ext == ".xlsx" else "text/csv"
+                with st.expander("📄 Individual Downloads", expanded=False):
+                    output_files = list(st.session_state.output_files.items())
                     
-                    # Use container to ensure buttons are fully visible
-                    button_container = st.container()
-                    with button_container:
-                        st.download_button(
-                            label=f"📄 {filename}",
-                            data=file_data,
-                            file_name=filename,
-                            mime=mime_type,
-                            key=f"download_{filename}",
-                            use_container_width=True
-                        )
-        
-        # Auto-refresh log when processing
-        if st.session_state.processing:
-            time.sleep(0.5)
-            st.rerun()
+                    # Every button reads its file on each rerun, so only one page
+                    # of them is created at a time
+                    page_count = -(-len(output_files) // DOWNLOADS_PER_PAGE)
+                    page = 1
+                    if page_count > 1:
+                        page = st.number_input("Page", min_value=1, max_value=page_count,
+                                               value=1, key="download_page")
+                    start = (page - 1) * DOWNLOADS_PER_PAGE
+                    
+                    # Create download buttons for each output file in a cleaner format
+                    for filename, file_path in output_files[start:start + DOWNLOADS_PER_PAGE]:
+                        mime_type = OUTPUT_MIME_TYPES.get(os.path.splitext(filename)[1].lower(), "application/octet-stream")
+                        
+                        # Use container to ensure buttons are fully visible
+                        button_container = st.container()
+                        with button_container, open(file_path, 'rb') as file_data:
+                            st.download_button(
+                                label=f"📄 {filename}",
+                                data=file_data,
+                                file_name=filename,
+                                mime=mime_type,
+                                key=f"download_{filename}",
+                                use_container_width=True
+                            )
     
     # Footer
     st.markdown("---")